@@ -0,0 +1,124 @@
+import re
+
+from lxml import etree
+
+
+INDENT = "    "
+ILLEGAL_XML_CHARS_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+ARTICLE_SCHEMA = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:element name="Article">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="Title" type="xs:string"/>
+        <xs:element name="Authors">
+          <xs:complexType>
+            <xs:sequence>
+              <xs:element name="Author" minOccurs="0" maxOccurs="unbounded">
+                <xs:complexType>
+                  <xs:sequence>
+                    <xs:element name="Name" type="xs:string"/>
+                    <xs:element name="Affiliation" type="xs:string"/>
+                    <xs:element name="ORCID" type="xs:string"/>
+                  </xs:sequence>
+                </xs:complexType>
+              </xs:element>
+            </xs:sequence>
+          </xs:complexType>
+        </xs:element>
+        <xs:element name="Keywords" type="xs:string"/>
+        <xs:element name="PDFName" type="xs:string"/>
+        <xs:element name="FileSize" type="xs:nonNegativeInteger"/>
+        <xs:element name="PublicationYear" type="xs:string"/>
+        <xs:element name="Volume" type="xs:string"/>
+        <xs:element name="Issue" type="xs:string"/>
+        <xs:element name="SourceID" type="xs:string"/>
+        <xs:element name="ContentProvider" type="xs:string"/>
+        <xs:element name="DOI" type="xs:string"/>
+        <xs:element name="PublisherItemType" type="xs:string"/>
+        <xs:element name="StartPage" type="xs:string"/>
+        <xs:element name="EndPage" type="xs:string"/>
+        <xs:element name="PageRange" type="xs:string"/>
+        <xs:element name="Abstract" type="xs:string" minOccurs="0"/>
+        <xs:element name="References" type="xs:string" minOccurs="0"/>
+        <xs:element name="ReferenceKeys" minOccurs="0">
+          <xs:simpleType>
+            <xs:list itemType="xs:string"/>
+          </xs:simpleType>
+        </xs:element>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+"""
+
+schema = None
+
+
+def xml_text(value):
+    return ILLEGAL_XML_CHARS_RE.sub("", "" if value is None else str(value))
+
+
+def write_field(xf, name, value, level=1):
+    xf.write("\n" + INDENT * level)
+    with xf.element(name):
+        xf.write(xml_text(value))
+
+
+def write_article(path, metadata, pdf_name="", pdf_size=0, content_provider=""):
+    with etree.xmlfile(path, encoding="UTF-8") as xf:
+        xf.write_declaration()
+        with xf.element("Article"):
+            write_field(xf, "Title", metadata.get("title", ""))
+
+            xf.write("\n" + INDENT)
+            with xf.element("Authors"):
+                for name, affil, orcid in metadata.get("authors", []):
+                    xf.write("\n" + INDENT * 2)
+                    with xf.element("Author"):
+                        write_field(xf, "Name", name, 3)
+                        write_field(xf, "Affiliation", affil, 3)
+                        write_field(xf, "ORCID", orcid, 3)
+                        xf.write("\n" + INDENT * 2)
+                if metadata.get("authors"):
+                    xf.write("\n" + INDENT)
+
+            write_field(xf, "Keywords", metadata.get("keywords", ""))
+            write_field(xf, "PDFName", pdf_name)
+            write_field(xf, "FileSize", pdf_size or 0)
+            write_field(xf, "PublicationYear", metadata.get("year", ""))
+            write_field(xf, "Volume", metadata.get("volume", ""))
+            write_field(xf, "Issue", metadata.get("issue", ""))
+            write_field(xf, "SourceID", metadata.get("job_id", ""))
+            write_field(xf, "ContentProvider", content_provider)
+            write_field(xf, "DOI", metadata.get("doi", ""))
+            write_field(xf, "PublisherItemType", "Journal Article")
+            write_field(xf, "StartPage", "")
+            write_field(xf, "EndPage", "")
+            write_field(xf, "PageRange", "")
+            if "abstract" in metadata:
+                write_field(xf, "Abstract", metadata["abstract"])
+            if "references" in metadata:
+                references = metadata["references"]
+                xf.write("\n" + INDENT)
+                with xf.element("References"):
+                    for chunk in ([references] if isinstance(references, str) else references or ()):
+                        xf.write(xml_text(chunk))
+                        xf.flush()
+            if metadata.get("reference_keys"):
+                write_field(xf, "ReferenceKeys", " ".join(metadata["reference_keys"]))
+            xf.write("\n")
+
+
+def validate_article(path):
+    global schema
+    if schema is None:
+        schema = etree.XMLSchema(etree.fromstring(ARTICLE_SCHEMA.encode("utf-8")))
+    try:
+        document = etree.parse(path, etree.XMLParser(recover=False))
+    except etree.XMLSyntaxError as e:
+        return str(e)
+    if not schema.validate(document):
+        return str(schema.error_log.last_error)
+    return None
@@ -0,0 +1,561 @@
+import argparse
+import asyncio
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from lxml import etree
+
+import article_xml
+import catalog
+import entity_store
+import host_scheduler
+import metrics
+import mock_ojs
+import page_archive
+import sol_23_07_2025 as scraper
+
+
+def old_path(url, article_id):
+    page = scraper.fetch_page(url)
+    return scraper.extract_metadata(page["soup"], article_id) if page and page["soup"] is not None else None
+
+
+def new_path(url, article_id):
+    return scraper.fetch_article(url, article_id)[1]
+
+
+def pages_per_second(fn, url_template, ids):
+    started = time.perf_counter()
+    for article_id in ids:
+        fn(url_template.format(article_id), article_id)
+    return len(ids) / (time.perf_counter() - started)
+
+
+def bench_prefilter(args):
+    accepted = list(range(2000, 2000 + args.pages))
+    rejected = list(range(5000, 5000 + args.pages))
+    scraper.scheduler = host_scheduler.HostScheduler(0, scraper.PAGE_CONCURRENCY + scraper.PDF_CONCURRENCY)
+    with mock_ojs.MockOJSServer(accepted, out_of_year_ids=rejected) as mock:
+        print(f"{'path':<6} {'accepted/s':>12} {'rejected/s':>12}")
+        for name, fn in (("old", old_path), ("new", new_path)):
+            acc = pages_per_second(fn, mock.url_template, accepted)
+            rej = pages_per_second(fn, mock.url_template, rejected)
+            print(f"{name:<6} {acc:>12.1f} {rej:>12.1f}")
+
+
+def bench_parsers(args):
+    root = os.path.dirname(os.path.abspath(__file__))
+    fixtures = [open(path, "rb").read() for path in sorted(glob.glob(os.path.join(root, "*", "*", "*", "page.html")))]
+
+    golden = None
+    for name, backend in scraper.PARSER_BACKENDS.items():
+        results = []
+        for data in fixtures:
+            tree = backend.parse(data)
+            results.append((backend.extract_metadata(tree, 0), backend.find_pdf_link(tree),
+                            backend.find_supplementary_links(tree)))
+        if golden is None:
+            golden = results
+        elif results != golden:
+            sys.exit(f"[FAIL] {name} backend output differs from the bs4 golden output")
+
+    print(f"{len(fixtures)} fixtures, all backends match the bs4 output")
+    print(f"{'backend':<8} {'pages/s':>10}")
+    for name, backend in scraper.PARSER_BACKENDS.items():
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            for data in fixtures:
+                backend.extract_metadata(backend.parse(data), 0)
+        rate = args.rounds * len(fixtures) / (time.perf_counter() - started)
+        print(f"{name:<8} {rate:>10.1f}")
+
+
+HOSTILE_PIECES = ["<", ">", "&", "&amp;", "&#0;", "&bogus;", "'", '"', "]]>", "<![CDATA[", "<!--", "-->",
+                  "\x00", "\x01", "\x0b", "\x1f", "\r", "\r\n", "\t", " ", "\ud800", "\ufffe", "\uffff",
+                  "é", "ñ", "\u202e", "\U0001f600", "abc", "10.31910/x"]
+
+
+def hostile_text(rng, max_pieces=30):
+    return "".join(rng.choice(HOSTILE_PIECES) for _ in range(rng.randint(0, max_pieces)))
+
+
+def hostile_metadata(rng):
+    return {
+        "title": hostile_text(rng),
+        "authors": [(hostile_text(rng), hostile_text(rng), hostile_text(rng)) for _ in range(rng.randint(0, 3))],
+        "doi": hostile_text(rng),
+        "keywords": hostile_text(rng),
+        "abstract": hostile_text(rng, 200),
+        "year": "2024",
+        "job_id": rng.randint(0, 10 ** 6),
+        "references": [hostile_text(rng, 100) for _ in range(rng.randint(0, 5))],
+    }
+
+
+def check_roundtrip(metadata, path):
+    root = etree.parse(path).getroot()
+    clean = article_xml.xml_text
+    expected = {
+        "Title": clean(metadata["title"]),
+        "Keywords": clean(metadata["keywords"]),
+        "DOI": clean(metadata["doi"]),
+        "Abstract": clean(metadata["abstract"]),
+        "References": "".join(clean(chunk) for chunk in metadata["references"]),
+    }
+    for name, value in expected.items():
+        if (root.findtext(name) or "") != value:
+            return name
+    authors = [tuple(author.findtext(field) or "" for field in ("Name", "Affiliation", "ORCID"))
+               for author in root.iterfind("Authors/Author")]
+    if authors != [tuple(clean(value) for value in author) for author in metadata["authors"]]:
+        return "Authors"
+    return article_xml.validate_article(path)
+
+
+def bench_xml(args):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "metadata.xml")
+        for case in range(args.cases):
+            metadata = hostile_metadata(rng)
+            article_xml.write_article(path, metadata, hostile_text(rng), rng.randint(0, 10 ** 9), hostile_text(rng))
+            failure = check_roundtrip(metadata, path)
+            if failure:
+                sys.exit(f"[FAIL] case {case} (seed {args.seed}): {failure} did not round-trip: {metadata!r}")
+        print(f"{args.cases} hostile records round-tripped and passed the schema check")
+
+        root = os.path.dirname(os.path.abspath(__file__))
+        fixtures = sorted(glob.glob(os.path.join(root, "*", "*", "*", "page.html")))
+        records = [scraper.extract_metadata(scraper.BeautifulSoup(open(p, "rb").read(), "lxml"), 0) for p in fixtures]
+        print(f"{'mode':<10} {'records/s':>10}")
+        for name, validate in (("write", False), ("validate", True)):
+            started = time.perf_counter()
+            for i in range(args.records):
+                metadata = records[i % len(records)]
+                article_xml.write_article(path, metadata, "3260.pdf", 685815, scraper.HARDCODED_JOURNAL_NAME)
+                if validate:
+                    article_xml.validate_article(path)
+            rate = args.records / (time.perf_counter() - started)
+            print(f"{name:<10} {rate:>10.1f}")
+
+
+def bench_archive(args):
+    root = os.path.dirname(os.path.abspath(__file__))
+    pages = [open(path, "rb").read() for path in sorted(glob.glob(os.path.join(root, "*", "*", "*", "page.html")))]
+    soups = [scraper.BeautifulSoup(data, "lxml") for data in pages]
+    modes = [("html", "gzip"), ("file", "gzip"), ("tar", "gzip"), ("warc", "gzip")]
+    if page_archive.zstandard is not None:
+        modes[2:2] = [("file", "zstd"), ("tar", "zstd")]
+
+    print(f"{'mode':<10} {'pages/s':>10} {'KB/page':>10} {'files':>8}")
+    for mode, codec in modes:
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = page_archive.PageArchive(tmp, mode, codec)
+            started = time.perf_counter()
+            for i in range(args.pages):
+                folder = os.path.join(tmp, str(i))
+                os.makedirs(folder)
+                data, soup = pages[i % len(pages)], soups[i % len(soups)]
+                archive.save(i, f"http://mock/{i}", data, folder, soup.prettify)
+            archive.close()
+            rate = args.pages / (time.perf_counter() - started)
+            files = sum(len(names) for _, _, names in os.walk(tmp))
+        label = mode if mode in ("html", "warc") else f"{mode}/{codec}"
+        print(f"{label:<10} {rate:>10.1f} {archive.stored_bytes / args.pages / 1024:>10.1f} {files:>8}")
+
+
+def bench_pipeline(args):
+    ids = list(range(2000, 2000 + args.pages))
+    with mock_ojs.MockOJSServer(ids) as mock:
+        print(f"{'workers':<8} {'articles/s':>12}")
+        for workers in args.workers:
+            with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+                stats = asyncio.run(scraper.crawl(
+                    ids, mock.url_template, tmp, args.page_concurrency, host_rate=0, parser=args.parser,
+                    resume=False, cache_max_bytes=0, export_catalog=False, archive_mode="off",
+                    parse_workers=workers,
+                ))
+            print(f"{workers:<8} {stats['rate']:>12.1f}")
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_PATH = os.path.join(HERE, "bench_results.jsonl")
+SCENARIOS = {
+    "recorded": {"mock": {}},
+    "synthetic": {"mock": {"synthetic": True, "latency": 0.02}},
+    "large-pdf": {"mock": {"synthetic": True, "pdf_bytes": 16 * 1024 ** 2}, "articles": 40},
+    "faulty": {"mock": {"synthetic": True, "latency": 0.02, "throttle_rate": 0.05, "reset_rate": 0.02}},
+}
+
+
+def suite_ids(count, not_found_every, out_of_year_every):
+    ids = range(2000, 2000 + count)
+    missing = {i for i in ids if not_found_every and i % not_found_every == 0}
+    old = {i for i in ids if out_of_year_every and i % out_of_year_every == 1} - missing
+    return ids, [i for i in ids if i not in missing and i not in old], sorted(old)
+
+
+def bytes_written(root):
+    seen = set()
+    total = 0
+    for folder, _, names in os.walk(root):
+        for name in names:
+            st = os.lstat(os.path.join(folder, name))
+            if (st.st_dev, st.st_ino) not in seen:
+                seen.add((st.st_dev, st.st_ino))
+                total += st.st_size
+    return total
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_crawler(command, log_path):
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+        if not hasattr(os, "wait4"):
+            return process.wait(), None
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, usage.ru_maxrss * 1024
+
+
+def run_scenario(name, args):
+    scenario = SCENARIOS[name]
+    ids, in_year, old = suite_ids(min(args.articles, scenario.get("articles", args.articles)),
+                                  args.not_found_every, args.out_of_year_every)
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock_ojs.MockOJSServer(in_year, out_of_year_ids=old, seed=args.seed, **scenario["mock"]) as mock:
+        root = os.path.join(tmp, "out")
+        command = [
+            sys.executable, os.path.join(HERE, "sol_23_07_2025.py"), "--root", root,
+            "--url-template", mock.url_template, "--discover", "range",
+            "--start", str(ids.start), "--end", str(ids.stop - 1), "--no-resume", "--host-rate", "0",
+            "--page-concurrency", str(args.page_concurrency), "--parse-workers", str(args.parse_workers),
+        ]
+        code, rss = run_crawler(command, os.path.join(tmp, "crawl.log"))
+        if code:
+            with open(os.path.join(tmp, "crawl.log")) as f:
+                sys.exit(f"[FAIL] {name}: crawler exited with {code}\n{f.read()[-2000:]}")
+        with open(os.path.join(root, metrics.SNAPSHOT_FILENAME)) as f:
+            snapshot = json.load(f)
+        written = bytes_written(root)
+
+    run = snapshot["run"]
+    rss = run.get("peak_rss_bytes") or rss
+    article = snapshot["stages"].get("article", {})
+    if run["articles_saved"] != len(in_year):
+        print(f"[WARN] {name}: saved {run['articles_saved']} of {len(in_year)} in-year articles")
+    return {
+        "scenario": name,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "articles": len(ids),
+        "parse_workers": args.parse_workers,
+        "page_concurrency": args.page_concurrency,
+        "articles_per_s": run["articles_checked"] / snapshot["uptime"],
+        "p50_ms": article.get("p50", 0.0) * 1000,
+        "p99_ms": article.get("p99", 0.0) * 1000,
+        "peak_rss_mb": rss / 1024 ** 2 if rss else None,
+        "written_mb": written / 1024 ** 2,
+        "saved": run["articles_saved"],
+        "failed": run["articles_failed"],
+        "requests": run["articles_requests"],
+    }
+
+
+def previous_result(results_path, result):
+    if not os.path.exists(results_path):
+        return None
+    previous = None
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if all(record.get(key) == result[key]
+                   for key in ("scenario", "articles", "parse_workers", "page_concurrency")):
+                previous = record
+    return previous
+
+
+def compare(result, previous, tolerance):
+    if not previous:
+        return "first run"
+    speed = result["articles_per_s"] / previous["articles_per_s"] - 1 if previous["articles_per_s"] else 0.0
+    p99 = result["p99_ms"] / previous["p99_ms"] - 1 if previous["p99_ms"] else 0.0
+    note = f"{speed:+.0%} rate, {p99:+.0%} p99 vs {previous['commit']}"
+    if speed < -tolerance or p99 > tolerance:
+        note = "[WARN] regression: " + note
+    return note
+
+
+def bench_suite(args):
+    print(f"{'scenario':<10} {'articles/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>8} {'written MB':>11} "
+          f"{'saved':>6} {'failed':>7}  vs previous")
+    for name in args.scenarios:
+        result = run_scenario(name, args)
+        note = compare(result, previous_result(args.results, result), args.tolerance)
+        rss = f"{result['peak_rss_mb']:.0f}" if result["peak_rss_mb"] else "n/a"
+        print(f"{name:<10} {result['articles_per_s']:>10.1f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+              f"{rss:>8} {result['written_mb']:>11.1f} {result['saved']:>6} {result['failed']:>7}  {note}")
+        if args.store:
+            with open(args.results, "a", encoding="utf-8") as f:
+                f.write(json.dumps(result) + "\n")
+
+
+def bench_cluster(args):
+    ids, in_year, old = suite_ids(args.articles, args.not_found_every, args.out_of_year_every)
+    script = os.path.join(HERE, "sol_23_07_2025.py")
+    print(f"{'workers':<8} {'articles/s':>12} {'merged':>8}")
+    with mock_ojs.MockOJSServer(in_year, out_of_year_ids=old, latency=args.latency, synthetic=True) as mock:
+        for workers in args.workers:
+            with tempfile.TemporaryDirectory() as tmp:
+                queue = os.path.join(tmp, "queue.sqlite3")
+                common = ["--url-template", mock.url_template, "--host-rate", "0", "--no-resume",
+                          "--page-concurrency", str(args.page_concurrency), "--lease-ttl", str(args.lease_ttl),
+                          "--parser", args.parser]
+                subprocess.run([sys.executable, script, "--coordinator", queue, "--discover", "range",
+                                "--start", str(ids.start), "--end", str(ids.stop - 1),
+                                "--lease-size", str(args.lease_size)] + common,
+                               check=True, stdout=subprocess.DEVNULL)
+
+                started = time.perf_counter()
+                processes = [
+                    subprocess.Popen([sys.executable, script, "--worker", queue, "--worker-id", f"worker{i}",
+                                      "--root", os.path.join(tmp, f"worker{i}")] + common,
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    for i in range(workers)
+                ]
+                if args.kill_after and workers > 1:
+                    time.sleep(args.kill_after)
+                    processes[0].kill()
+                for process in processes[1 if args.kill_after and workers > 1 else 0:]:
+                    if process.wait():
+                        sys.exit(f"[FAIL] worker exited with {process.returncode}")
+                elapsed = time.perf_counter() - started
+
+                merged_root = os.path.join(tmp, "merged")
+                subprocess.run([sys.executable, script, "--merge", queue, "--root", merged_root],
+                               check=True, stdout=subprocess.DEVNULL)
+                merged = len(catalog.CatalogSink(merged_root).latest_offsets())
+            print(f"{workers:<8} {len(ids) / elapsed:>12.1f} {merged:>8}")
+            if merged != len(in_year):
+                print(f"[WARN] merged catalog has {merged} of {len(in_year)} in-year articles")
+
+
+def bench_incremental(args):
+    ids, in_year, old = suite_ids(args.articles, args.not_found_every, args.out_of_year_every)
+    changed = in_year[args.withdraw:] + [ids.stop + 2, ids.stop + 5]
+    revised = in_year[-args.revise:] if args.revise else []
+    runs = [("full", in_year, ()), ("no change", in_year, ()), ("changed", changed, revised)]
+    port = 0
+    print(f"{'run':<10} {'seconds':>8} {'requests':>9} {'MB in':>7}  changes")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, served, revised_ids in runs:
+            with mock_ojs.MockOJSServer(served, out_of_year_ids=old, latency=args.latency, synthetic=True,
+                                        revised_ids=revised_ids, port=port) as mock, \
+                    contextlib.redirect_stdout(io.StringIO()):
+                port = mock.server.server_address[1]
+                stats = asyncio.run(scraper.crawl(
+                    ids, mock.url_template, tmp, host_rate=args.host_rate, parser="lxml", archive_mode="off",
+                    export_catalog=False, incremental=True,
+                ))
+            changes = ", ".join(f"{stats['changes'][kind]} {kind}" for kind in scraper.CHANGE_KINDS)
+            print(f"{name:<10} {stats['elapsed']:>8.1f} {stats['requests']:>9} "
+                  f"{stats['downloaded_bytes'] / 1024 ** 2:>7.1f}  {changes}")
+
+
+def bench_memory(args):
+    ids, in_year, old = suite_ids(args.articles, args.not_found_every, args.out_of_year_every)
+    bounds = ["--parser", args.parser, "--max-buffered-mb", str(args.max_buffered_mb)]
+    print(f"{'page MB':>8} {'conc.':>6} {'RSS MB':>8} {'articles/s':>11} {'saved':>6}")
+    peaks = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for page_mb in args.page_mb:
+            with mock_ojs.MockOJSServer(in_year, out_of_year_ids=old, latency=args.latency, synthetic=True,
+                                        page_bytes=int(page_mb * 1024 ** 2)) as mock:
+                for concurrency in args.concurrency:
+                    root = os.path.join(tmp, f"{page_mb}-{concurrency}")
+                    command = [
+                        sys.executable, os.path.join(HERE, "sol_23_07_2025.py"), "--root", root,
+                        "--url-template", mock.url_template, "--discover", "range",
+                        "--start", str(ids.start), "--end", str(ids.stop - 1), "--no-resume", "--host-rate", "0",
+                        "--page-concurrency", str(concurrency), "--archive", "off", "--cache-size-mb", "0",
+                    ] + bounds
+                    code, _ = run_crawler(command, root + ".log")
+                    if code:
+                        with open(root + ".log") as f:
+                            sys.exit(f"[FAIL] crawler exited with {code}\n{f.read()[-2000:]}")
+                    with open(os.path.join(root, metrics.SNAPSHOT_FILENAME)) as f:
+                        snapshot = json.load(f)
+                    run = snapshot["run"]
+                    peaks[page_mb, concurrency] = run["peak_rss_bytes"] / 1024 ** 2
+                    print(f"{page_mb:>8.2f} {concurrency:>6} {peaks[page_mb, concurrency]:>8.0f} "
+                          f"{run['articles_checked'] / snapshot['uptime']:>11.1f} {run['articles_saved']:>6}")
+
+    failures = []
+    for page_mb in args.page_mb:
+        runs = [peaks[page_mb, concurrency] for concurrency in args.concurrency
+                if not args.max_buffered_mb or concurrency * page_mb >= args.max_buffered_mb]
+        if runs and max(runs) > min(runs) * (1 + args.tolerance):
+            failures.append(f"{page_mb} MB pages: {min(runs):.0f} -> {max(runs):.0f} MB as concurrency grows")
+    growth = max(peaks.values()) - min(peaks.values())
+    print(f"peak RSS grew {growth:.0f} MB from the smallest to the largest run (allowed {args.max_growth_mb:.0f} MB)")
+    if growth > args.max_growth_mb:
+        failures.append(f"{growth:.0f} MB growth from the smallest run")
+    if failures:
+        sys.exit(f"[FAIL] peak RSS is not flat with --parser {args.parser} --max-buffered-mb {args.max_buffered_mb}: "
+                 + "; ".join(failures))
+
+
+def catalog_orcid_scan(root, orcid):
+    found = set()
+    with open(os.path.join(root, catalog.JSONL_FILENAME), encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if any(entity_store.orcid_id(author["orcid"]) == orcid for author in record["authors"]):
+                found.add(record["article_id"])
+    return sorted(found)
+
+
+def bench_entities(args):
+    ids, in_year, old = suite_ids(args.articles, args.not_found_every, args.out_of_year_every)
+    print(f"{'entities':<9} {'seconds':>8} {'export KB':>10} {'lookup ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock_ojs.MockOJSServer(in_year, out_of_year_ids=old, synthetic=True,
+                                   page_bytes=int(args.page_mb * 1024 ** 2)) as mock:
+        for entities in (False, True):
+            root = os.path.join(tmp, "on" if entities else "off")
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = asyncio.run(scraper.crawl(
+                    ids, mock.url_template, root, host_rate=0, parser=args.parser, archive_mode="off",
+                    cache_max_bytes=0, entities=entities,
+                ))
+            exported = sum(os.path.getsize(os.path.join(root, name)) for name in os.listdir(root)
+                           if name == catalog.JSONL_FILENAME or name.endswith(".parquet"))
+            if entities:
+                store = entity_store.EntityStore(root)
+                orcid = store.db.execute("SELECT orcid FROM article_authors WHERE orcid IS NOT NULL "
+                                         "GROUP BY orcid ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+                found, elapsed = metrics.timed(store.articles_by_orcid, orcid)
+                store.close()
+                if found != catalog_orcid_scan(root, orcid):
+                    sys.exit(f"[FAIL] the entity index and a catalog scan disagree on the articles by {orcid}")
+            else:
+                orcid = None
+                _, elapsed = metrics.timed(catalog_orcid_scan, root, "")
+            print(f"{'on' if entities else 'off':<9} {stats['elapsed']:>8.1f} {exported / 1024:>10.0f} "
+                  f"{elapsed * 1000:>10.1f}")
+        print(f"lookup: articles by {orcid}, a catalog.jsonl rescan without entities, the index with them")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline scraper benchmarks against the local OJS stand-in.")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("prefilter", help="year pre-filter vs full parse, accepted and rejected pages/s")
+    p.add_argument("--pages", type=int, default=50)
+    p.set_defaults(func=bench_prefilter)
+
+    p = sub.add_parser("parsers", help="parser backend equivalence on the page.html fixtures, pages/s per backend")
+    p.add_argument("--rounds", type=int, default=20)
+    p.set_defaults(func=bench_parsers)
+
+    p = sub.add_parser("xml", help="metadata.xml serializer: hostile-character round trip, records/s")
+    p.add_argument("--cases", type=int, default=2000)
+    p.add_argument("--records", type=int, default=2000)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=bench_xml)
+
+    p = sub.add_parser("archive", help="page archive modes: pages/s, stored KB per page, files created")
+    p.add_argument("--pages", type=int, default=200)
+    p.set_defaults(func=bench_archive)
+
+    p = sub.add_parser("pipeline", help="end-to-end articles/s against the mock for each --parse-workers count")
+    p.add_argument("--pages", type=int, default=200)
+    p.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    p.add_argument("--page-concurrency", type=int, default=16)
+    p.add_argument("--parser", choices=sorted(scraper.PARSER_BACKENDS), default="bs4")
+    p.set_defaults(func=bench_pipeline)
+
+    p = sub.add_parser("suite", help="full crawler runs against mock scenarios: rate, latency, RSS, bytes written")
+    p.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    p.add_argument("--articles", type=int, default=200)
+    p.add_argument("--not-found-every", type=int, default=5, help="every Nth ID is a 404")
+    p.add_argument("--out-of-year-every", type=int, default=7, help="every Nth ID is a 2019 article")
+    p.add_argument("--page-concurrency", type=int, default=16)
+    p.add_argument("--parse-workers", type=int, default=0)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--results", default=RESULTS_PATH, help="JSONL file the results are appended to and compared with")
+    p.add_argument("--no-store", dest="store", action="store_false", help="compare but don't append the results")
+    p.add_argument("--tolerance", type=float, default=0.15,
+                   help="flag a regression when the rate drops or p99 grows by more than this fraction")
+    p.set_defaults(func=bench_suite)
+
+    p = sub.add_parser("cluster", help="coordinator plus N worker processes sharing a lease queue, then merge")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    p.add_argument("--articles", type=int, default=200)
+    p.add_argument("--not-found-every", type=int, default=5)
+    p.add_argument("--out-of-year-every", type=int, default=7)
+    p.add_argument("--latency", type=float, default=0.5, help="seconds of mock latency per response")
+    p.add_argument("--parser", choices=sorted(scraper.PARSER_BACKENDS), default="lxml")
+    p.add_argument("--page-concurrency", type=int, default=2)
+    p.add_argument("--lease-size", type=int, default=20)
+    p.add_argument("--lease-ttl", type=float, default=10.0)
+    p.add_argument("--kill-after", type=float, default=0.0,
+                   help="kill the first worker after this many seconds to exercise lease reclaim")
+    p.set_defaults(func=bench_cluster)
+
+    p = sub.add_parser("incremental", help="full run, no-change --incremental run, then a run with changed pages")
+    p.add_argument("--articles", type=int, default=100)
+    p.add_argument("--not-found-every", type=int, default=5)
+    p.add_argument("--out-of-year-every", type=int, default=7)
+    p.add_argument("--withdraw", type=int, default=2, help="articles that disappear before the third run")
+    p.add_argument("--revise", type=int, default=3, help="articles whose title changes before the third run")
+    p.add_argument("--latency", type=float, default=0.02)
+    p.add_argument("--host-rate", type=float, default=scraper.HOST_RATE_LIMIT)
+    p.set_defaults(func=bench_incremental)
+
+    p = sub.add_parser("memory", help="peak crawler RSS as page size and concurrency grow, fails if it is not flat")
+    p.add_argument("--page-mb", type=float, nargs="+", default=[0.15, 2.0, 8.0],
+                   help="pad article pages to these sizes with extra references")
+    p.add_argument("--concurrency", type=int, nargs="+", default=[4, 16, 32])
+    p.add_argument("--articles", type=int, default=60)
+    p.add_argument("--not-found-every", type=int, default=5)
+    p.add_argument("--out-of-year-every", type=int, default=7)
+    p.add_argument("--latency", type=float, default=0.02)
+    p.add_argument("--parser", choices=sorted(scraper.PARSER_BACKENDS), default="stream")
+    p.add_argument("--max-buffered-mb", type=float, default=32.0)
+    p.add_argument("--tolerance", type=float, default=0.25,
+                   help="fail when peak RSS grows by more than this fraction across the concurrency levels that "
+                        "fill the page buffer")
+    p.add_argument("--max-growth-mb", type=float, default=320.0,
+                   help="fail when the largest peak RSS exceeds the smallest by more than this")
+    p.set_defaults(func=bench_memory)
+
+    p = sub.add_parser("entities", help="catalog export size and articles-by-ORCID lookup with and without "
+                                         "the entity index")
+    p.add_argument("--articles", type=int, default=200)
+    p.add_argument("--not-found-every", type=int, default=5)
+    p.add_argument("--out-of-year-every", type=int, default=7)
+    p.add_argument("--page-mb", type=float, default=0.0, help="pad article pages to this size with extra references")
+    p.add_argument("--parser", choices=sorted(scraper.PARSER_BACKENDS), default="lxml")
+    p.set_defaults(func=bench_entities)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -0,0 +1,83 @@
+import os
+import shutil
+import threading
+
+
+BLOBS_DIRNAME = ".blobs"
+
+
+class BlobStore:
+    def __init__(self, root):
+        self.dir = os.path.join(root, BLOBS_DIRNAME)
+        os.makedirs(self.dir, exist_ok=True)
+        self.urls = {}
+        self.url_locks = {}
+        self.lock = threading.Lock()
+        self.url_hits = 0
+        self.dedup_hits = 0
+        self.stored_bytes = 0
+        self.linked_bytes = 0
+
+    def blob_path(self, digest):
+        return os.path.join(self.dir, digest[:2], digest)
+
+    def url_lock(self, url):
+        with self.lock:
+            return self.url_locks.setdefault(url, threading.Lock())
+
+    def lookup(self, url):
+        with self.lock:
+            entry = self.urls.get(url)
+        if entry and os.path.exists(self.blob_path(entry[0])):
+            return entry
+        return None
+
+    def has(self, digest):
+        return os.path.exists(self.blob_path(digest))
+
+    def ingest(self, url, file_path, digest):
+        blob = self.blob_path(digest)
+        size = os.path.getsize(file_path)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        with self.lock:
+            if os.path.exists(blob) and os.path.samefile(blob, file_path):
+                self.url_hits += 1
+                self.linked_bytes += size
+                self.urls[url] = (digest, size)
+                return size
+            if os.path.exists(blob):
+                self.dedup_hits += 1
+                self.linked_bytes += size
+                os.remove(file_path)
+            else:
+                os.replace(file_path, blob)
+                self.stored_bytes += size
+            self.urls[url] = (digest, size)
+        self.link(digest, file_path)
+        return size
+
+    def place(self, url, file_path):
+        digest, size = self.urls[url]
+        with self.lock:
+            self.url_hits += 1
+            self.linked_bytes += size
+        self.link(digest, file_path)
+        return digest, size
+
+    def link(self, digest, file_path):
+        blob = self.blob_path(digest)
+        if os.path.lexists(file_path):
+            if os.path.exists(file_path) and os.path.samefile(blob, file_path):
+                return
+            os.remove(file_path)
+        try:
+            os.link(blob, file_path)
+        except OSError:
+            try:
+                os.symlink(os.path.relpath(blob, os.path.dirname(file_path)), file_path)
+            except OSError:
+                shutil.copyfile(blob, file_path)
+
+    def summary(self):
+        return (f"{self.stored_bytes / 1024 ** 2:.1f} MB stored, {self.linked_bytes / 1024 ** 2:.1f} MB deduplicated "
+                f"({self.url_hits} URL hits, {self.dedup_hits} content hits)")
@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+JSONL_FILENAME = "catalog.jsonl"
+PARQUET_FILENAME = "catalog.parquet"
+BATCH_SIZE = 64
+BATCH_BYTES = 1024 ** 2
+ROW_GROUP_SIZE = 10000
+ROW_GROUP_BYTES = 4 * 1024 ** 2
+
+
+def catalog_schema():
+    author = pa.struct([("name", pa.string()), ("affiliation", pa.string()), ("orcid", pa.string())])
+    return pa.schema([
+        ("article_id", pa.int64()),
+        ("title", pa.string()),
+        ("authors", pa.list_(author)),
+        ("doi", pa.string()),
+        ("keywords", pa.list_(pa.string())),
+        ("abstract", pa.string()),
+        ("year", pa.string()),
+        ("journal", pa.string()),
+        ("references", pa.string()),
+        ("reference_keys", pa.list_(pa.string())),
+        ("pdf_name", pa.string()),
+        ("pdf_size", pa.int64()),
+        ("folder", pa.string()),
+        ("crawled_at", pa.float64()),
+    ])
+
+
+class CatalogSink:
+    def __init__(self, root, batch_size=BATCH_SIZE):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.jsonl_path = os.path.join(root, JSONL_FILENAME)
+        self.parquet_path = os.path.join(root, PARQUET_FILENAME)
+        self.batch_size = batch_size
+        self.buffer = []
+        self.buffered_bytes = 0
+        self.lock = threading.Lock()
+        self.written = 0
+
+    def add(self, metadata, pdf_name, pdf_size, folder):
+        references = metadata.get("references", "")
+        record = {
+            "article_id": int(metadata["job_id"]),
+            "title": metadata.get("title", ""),
+            "authors": [{"name": name, "affiliation": affil, "orcid": orcid}
+                        for name, affil, orcid in metadata.get("authors", [])],
+            "doi": metadata.get("doi", ""),
+            "keywords": [k for k in metadata.get("keywords", "").split("|") if k],
+            "abstract": metadata.get("abstract", ""),
+            "year": metadata.get("year", ""),
+            "journal": metadata.get("journal", ""),
+            "references": references if isinstance(references, str) else " ".join(references),
+            "reference_keys": metadata.get("reference_keys") or [],
+            "pdf_name": pdf_name,
+            "pdf_size": pdf_size,
+            "folder": os.path.relpath(folder, self.root),
+            "crawled_at": time.time(),
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.buffer.append(line)
+            self.buffered_bytes += len(line)
+            if len(self.buffer) >= self.batch_size or self.buffered_bytes >= BATCH_BYTES:
+                self.flush_locked()
+
+    def flush_locked(self):
+        if not self.buffer:
+            return
+        with open(self.jsonl_path, "a", encoding="utf-8") as f:
+            f.write("".join(self.buffer))
+        self.written += len(self.buffer)
+        self.buffer = []
+        self.buffered_bytes = 0
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def latest_offsets(self):
+        offsets = {}
+        with open(self.jsonl_path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    offsets[json.loads(line)["article_id"]] = offset
+                except ValueError:
+                    pass
+                offset += len(line)
+        return sorted(offsets.values())
+
+    def write_parquet(self):
+        if pa is None:
+            print("[WARN] pyarrow is not installed, skipping the Parquet catalog")
+            return 0
+        if not os.path.exists(self.jsonl_path):
+            return 0
+
+        schema = catalog_schema()
+        tmp_path = self.parquet_path + ".part"
+        rows = 0
+        with open(self.jsonl_path, "rb") as f, pq.ParquetWriter(tmp_path, schema) as writer:
+            batch = []
+            batch_bytes = 0
+            for offset in self.latest_offsets():
+                f.seek(offset)
+                line = f.readline()
+                batch.append(json.loads(line))
+                batch_bytes += len(line)
+                if len(batch) >= ROW_GROUP_SIZE or batch_bytes >= ROW_GROUP_BYTES:
+                    writer.write_table(pa.Table.from_pylist(batch, schema))
+                    rows += len(batch)
+                    batch = []
+                    batch_bytes = 0
+            if batch:
+                writer.write_table(pa.Table.from_pylist(batch, schema))
+                rows += len(batch)
+        os.replace(tmp_path, self.parquet_path)
+        return rows
+
+    def close(self):
+        self.flush()
+        rows = self.write_parquet() if self.written or not os.path.exists(self.parquet_path) else 0
+        return f"{self.written} records appended to {JSONL_FILENAME}" + (
+            f", {rows} rows in {PARQUET_FILENAME}" if rows else ""
+        )
@@ -0,0 +1,104 @@
+import os
+import sqlite3
+import time
+
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+NOT_FOUND = "404"
+SKIPPED_BY_YEAR = "skipped-by-year"
+
+FINAL_STATUSES = (DONE, NOT_FOUND, SKIPPED_BY_YEAR)
+
+JOURNAL_FILENAME = "crawl_journal.sqlite3"
+
+
+class CrawlJournal:
+    def __init__(self, root):
+        os.makedirs(root, exist_ok=True)
+        self.path = os.path.join(root, JOURNAL_FILENAME)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                article_id INTEGER PRIMARY KEY,
+                status TEXT NOT NULL,
+                content_hash TEXT,
+                pdf_size INTEGER,
+                first_seen REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                fingerprint TEXT
+            )
+        """)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(articles)")}
+        if "fingerprint" not in columns:
+            self.db.execute("ALTER TABLE articles ADD COLUMN fingerprint TEXT")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS dead_letters (
+                article_id INTEGER PRIMARY KEY,
+                reason TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                failed_at REAL NOT NULL
+            )
+        """)
+        self.db.commit()
+
+    def record(self, article_id, status, content_hash=None, pdf_size=None, fingerprint=None):
+        now = time.time()
+        self.db.execute("""
+            INSERT INTO articles (article_id, status, content_hash, pdf_size, first_seen, updated_at, fingerprint)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(article_id) DO UPDATE SET
+                status = excluded.status,
+                content_hash = COALESCE(excluded.content_hash, content_hash),
+                pdf_size = COALESCE(excluded.pdf_size, pdf_size),
+                updated_at = excluded.updated_at,
+                fingerprint = COALESCE(excluded.fingerprint, fingerprint)
+        """, (article_id, status, content_hash, pdf_size, now, now, fingerprint))
+        if status in FINAL_STATUSES:
+            self.db.execute("DELETE FROM dead_letters WHERE article_id = ?", (article_id,))
+        self.db.commit()
+
+    def dead_letter(self, article_id, reason):
+        self.record(article_id, FAILED)
+        self.db.execute("""
+            INSERT INTO dead_letters (article_id, reason, attempts, failed_at) VALUES (?, ?, 1, ?)
+            ON CONFLICT(article_id) DO UPDATE SET
+                reason = excluded.reason,
+                attempts = attempts + 1,
+                failed_at = excluded.failed_at
+        """, (article_id, reason, time.time()))
+        self.db.commit()
+
+    def dead_letters(self):
+        return self.db.execute("SELECT article_id, reason, attempts FROM dead_letters ORDER BY article_id").fetchall()
+
+    def finished_ids(self):
+        placeholders = ", ".join("?" * len(FINAL_STATUSES))
+        rows = self.db.execute(f"SELECT article_id FROM articles WHERE status IN ({placeholders})", FINAL_STATUSES)
+        return {row[0] for row in rows}
+
+    def fingerprints(self):
+        rows = self.db.execute("SELECT article_id, content_hash, fingerprint FROM articles WHERE status = ?", (DONE,))
+        return {article_id: (content_hash, fingerprint) for article_id, content_hash, fingerprint in rows}
+
+    def statuses(self, article_ids):
+        placeholders = ", ".join("?" * len(article_ids))
+        rows = self.db.execute(f"SELECT article_id, status FROM articles WHERE article_id IN ({placeholders})",
+                               list(article_ids))
+        return dict(rows)
+
+    def ids_with_status(self, status):
+        return {row[0] for row in self.db.execute("SELECT article_id FROM articles WHERE status = ?", (status,))}
+
+    def pending(self, article_ids):
+        finished = self.finished_ids()
+        return [article_id for article_id in article_ids if article_id not in finished]
+
+    def counts(self):
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM articles GROUP BY status"))
+
+    def close(self):
+        self.db.close()
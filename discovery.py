@@ -0,0 +1,113 @@
+import re
+from urllib.parse import urlencode, urljoin
+
+import lxml.html
+from lxml import etree
+
+
+OAI_NS = {"oai": "http://www.openarchives.org/OAI/2.0/"}
+OAI_ARTICLE_RE = re.compile(r"article/(\d+)$")
+ISSUE_LINK_RE = re.compile(r"/issue/view/(\d+)")
+ARCHIVE_PAGE_RE = re.compile(r"/issue/archive/(\d+)$")
+ARTICLE_LINK_RE = re.compile(r"/article/view/(\d+)")
+YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+
+
+class DiscoveryError(Exception):
+    pass
+
+
+def journal_base(url_template):
+    return url_template.split("/article/view/")[0]
+
+
+def oai_article_ids(oai_url, fetch, from_date=None, until_date=None):
+    params = {"verb": "ListIdentifiers", "metadataPrefix": "oai_dc"}
+    if from_date:
+        params["from"] = from_date
+    if until_date:
+        params["until"] = until_date
+
+    url = f"{oai_url}?{urlencode(params)}"
+    while url:
+        data = fetch(url)
+        if data is None:
+            raise DiscoveryError(f"OAI request failed: {url}")
+        root = etree.fromstring(data)
+
+        error = root.find("oai:error", OAI_NS)
+        if error is not None:
+            if error.get("code") == "noRecordsMatch":
+                return
+            raise DiscoveryError(f"OAI error {error.get('code')}: {error.text}")
+
+        for header in root.iterfind(".//oai:header", OAI_NS):
+            if header.get("status") == "deleted":
+                continue
+            match = OAI_ARTICLE_RE.search(header.findtext("oai:identifier", "", OAI_NS))
+            if match:
+                yield int(match.group(1))
+
+        token = root.findtext(".//oai:resumptionToken", "", OAI_NS).strip()
+        url = f"{oai_url}?{urlencode({'verb': 'ListIdentifiers', 'resumptionToken': token})}" if token else None
+
+
+def archive_article_ids(archive_url, fetch, years):
+    seen_pages = set()
+    pending_pages = [archive_url]
+    issue_urls = {}
+
+    while pending_pages:
+        page_url = pending_pages.pop()
+        if page_url in seen_pages:
+            continue
+        seen_pages.add(page_url)
+        data = fetch(page_url)
+        if data is None:
+            if page_url == archive_url:
+                raise DiscoveryError(f"Issue archive unavailable: {archive_url}")
+            continue
+
+        tree = lxml.html.document_fromstring(data)
+        for link in tree.iterfind(".//a[@href]"):
+            href = urljoin(page_url, link.get("href"))
+            if ARCHIVE_PAGE_RE.search(href):
+                pending_pages.append(href)
+                continue
+            match = ISSUE_LINK_RE.search(href)
+            if match and set(m.group(0) for m in YEAR_RE.finditer(link.text_content())) & years:
+                issue_urls[match.group(1)] = href
+
+    article_ids = set()
+    for issue_url in issue_urls.values():
+        data = fetch(issue_url)
+        if data is None:
+            print(f"[WARN] Issue TOC unavailable: {issue_url}")
+            continue
+        for href in lxml.html.document_fromstring(data).xpath("//a/@href"):
+            match = ARTICLE_LINK_RE.search(href)
+            if match:
+                article_ids.add(int(match.group(1)))
+    return article_ids
+
+
+def discover_article_ids(method, url_template, fetch, years, fallback_ids):
+    base = journal_base(url_template)
+    methods = ["oai", "archive", "range"] if method == "auto" else [method]
+
+    for name in methods:
+        try:
+            if name == "oai":
+                ids = set(oai_article_ids(f"{base}/oai", fetch, from_date=f"{min(years)}-01-01"))
+            elif name == "archive":
+                ids = archive_article_ids(f"{base}/issue/archive", fetch, years)
+            else:
+                ids = set(fallback_ids)
+        except (DiscoveryError, etree.XMLSyntaxError) as e:
+            print(f"[WARN] {name} discovery failed: {e}")
+            continue
+        if ids or name == methods[-1]:
+            print(f"Discovered {len(ids)} article IDs via {name}")
+            return sorted(ids)
+        print(f"[WARN] {name} discovery found no articles")
+    return sorted(fallback_ids)
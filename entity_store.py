@@ -0,0 +1,244 @@
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+ENTITIES_FILENAME = "entities.sqlite3"
+EXPORT_BATCH_ROWS = 10000
+AUTHOR_CACHE_SIZE = 4096
+ORCID_RE = re.compile(r"(\d{4}-\d{4}-\d{4}-\d{3}[\dXx])")
+DOI_RE = re.compile(r"\b(10\.\d{4,9}/[^\s\"<>]+)")
+DOI_TRAILING = ".,;:)]}'"
+
+
+def orcid_id(value):
+    match = ORCID_RE.search(value or "")
+    return match.group(1).upper() if match else ""
+
+
+def reference_doi(text):
+    match = DOI_RE.search(text)
+    return match.group(1).rstrip(DOI_TRAILING).lower() if match else ""
+
+
+def reference_key(text, doi):
+    if doi:
+        return "doi:" + doi
+    return "text:" + hashlib.sha1(" ".join(text.lower().split()).encode("utf-8")).hexdigest()[:20]
+
+
+def export_tables():
+    return {
+        "authors": ("authors.parquet", pa.schema([("orcid", pa.string()), ("name", pa.string()),
+                                                  ("affiliation_id", pa.int64()), ("url", pa.string())])),
+        "affiliations": ("affiliations.parquet", pa.schema([("affiliation_id", pa.int64()), ("text", pa.string())])),
+        "refs": ("references.parquet", pa.schema([("ref_key", pa.string()), ("doi", pa.string()),
+                                                  ("text", pa.string())])),
+    }
+
+
+class EntityStore:
+    def __init__(self, root, cache_size=AUTHOR_CACHE_SIZE):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.path = os.path.join(root, ENTITIES_FILENAME)
+        self.cache_size = cache_size
+        self.authors = OrderedDict()
+        self.affiliations = {}
+        self.hits = 0
+        self.misses = 0
+        self.citations = 0
+        self.shared = 0
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS affiliations (
+                affiliation_id INTEGER PRIMARY KEY,
+                text TEXT NOT NULL UNIQUE
+            )
+        """)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS authors (
+                orcid TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                affiliation_id INTEGER,
+                url TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS refs (
+                ref_key TEXT PRIMARY KEY,
+                doi TEXT,
+                text TEXT NOT NULL
+            )
+        """)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS article_authors (
+                article_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                orcid TEXT,
+                name TEXT NOT NULL,
+                affiliation_id INTEGER,
+                PRIMARY KEY (article_id, position)
+            )
+        """)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS article_refs (
+                article_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                ref_key TEXT NOT NULL,
+                PRIMARY KEY (article_id, position)
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS article_authors_orcid ON article_authors (orcid)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS article_refs_key ON article_refs (ref_key)")
+        self.db.commit()
+
+    def affiliation(self, text):
+        if not text:
+            return None, ""
+        interned = self.affiliations.get(text)
+        if interned is None:
+            self.db.execute("INSERT OR IGNORE INTO affiliations (text) VALUES (?)", (text,))
+            affiliation_id = self.db.execute("SELECT affiliation_id FROM affiliations WHERE text = ?",
+                                             (text,)).fetchone()[0]
+            interned = self.affiliations[text] = (affiliation_id, sys.intern(text))
+        return interned
+
+    def author(self, orcid, name, affil, url):
+        affiliation_id, affil = self.affiliation(affil)
+        record = self.authors.get(orcid)
+        if record is not None and record == (name, affil, url):
+            self.hits += 1
+            self.authors.move_to_end(orcid)
+            return affiliation_id, record
+
+        self.misses += 1
+        row = self.db.execute("SELECT name, affiliation_id, url FROM authors WHERE orcid = ?", (orcid,)).fetchone()
+        if row != (name, affiliation_id, url):
+            self.db.execute("""
+                INSERT INTO authors (orcid, name, affiliation_id, url, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(orcid) DO UPDATE SET
+                    name = excluded.name,
+                    affiliation_id = excluded.affiliation_id,
+                    url = excluded.url,
+                    updated_at = excluded.updated_at
+            """, (orcid, name, affiliation_id, url, time.time()))
+        record = self.authors[orcid] = (name, affil, url)
+        self.authors.move_to_end(orcid)
+        if len(self.authors) > self.cache_size:
+            self.authors.popitem(last=False)
+        return affiliation_id, record
+
+    def add_article(self, article_id, authors, references):
+        self.db.execute("DELETE FROM article_authors WHERE article_id = ?", (article_id,))
+        self.db.execute("DELETE FROM article_refs WHERE article_id = ?", (article_id,))
+
+        records = []
+        for position, (name, affil, url) in enumerate(authors):
+            orcid = orcid_id(url)
+            if orcid:
+                affiliation_id, record = self.author(orcid, name, affil, url)
+            else:
+                affiliation_id, affil = self.affiliation(affil)
+                record = (name, affil, url)
+            self.db.execute("INSERT INTO article_authors (article_id, position, orcid, name, affiliation_id) "
+                            "VALUES (?, ?, ?, ?, ?)", (article_id, position, orcid or None, name, affiliation_id))
+            records.append(record)
+
+        keys = []
+        for position, text in enumerate(references):
+            doi = reference_doi(text)
+            key = reference_key(text, doi)
+            added = self.db.execute("INSERT OR IGNORE INTO refs (ref_key, doi, text) VALUES (?, ?, ?)",
+                                    (key, doi or None, text)).rowcount
+            self.db.execute("INSERT INTO article_refs (article_id, position, ref_key) VALUES (?, ?, ?)",
+                            (article_id, position, key))
+            self.citations += 1
+            self.shared += not added
+            keys.append(key)
+        self.db.commit()
+        return records, keys
+
+    def articles_by_orcid(self, orcid):
+        return [row[0] for row in self.db.execute(
+            "SELECT DISTINCT article_id FROM article_authors WHERE orcid = ? ORDER BY article_id", (orcid_id(orcid),)
+        )]
+
+    def articles_citing(self, doi):
+        return [row[0] for row in self.db.execute(
+            "SELECT DISTINCT article_id FROM article_refs WHERE ref_key = ? ORDER BY article_id",
+            (reference_key("", reference_doi(doi)),)
+        )]
+
+    def merge(self, path):
+        self.db.execute("ATTACH DATABASE ? AS other", (path,))
+        try:
+            self.db.execute("INSERT OR IGNORE INTO affiliations (text) SELECT text FROM other.affiliations")
+            remap = """
+                (SELECT a.affiliation_id FROM affiliations a JOIN other.affiliations o ON o.text = a.text
+                 WHERE o.affiliation_id = src.affiliation_id)
+            """
+            self.db.execute(f"""
+                INSERT INTO authors (orcid, name, affiliation_id, url, updated_at)
+                SELECT orcid, name, {remap}, url, updated_at FROM other.authors src WHERE true
+                ON CONFLICT(orcid) DO UPDATE SET
+                    name = excluded.name,
+                    affiliation_id = excluded.affiliation_id,
+                    url = excluded.url,
+                    updated_at = excluded.updated_at
+                WHERE excluded.updated_at > authors.updated_at
+            """)
+            self.db.execute("INSERT OR IGNORE INTO refs SELECT * FROM other.refs")
+            self.db.execute(f"""
+                INSERT OR REPLACE INTO article_authors (article_id, position, orcid, name, affiliation_id)
+                SELECT article_id, position, orcid, name, {remap} FROM other.article_authors src
+            """)
+            self.db.execute("INSERT OR REPLACE INTO article_refs SELECT * FROM other.article_refs")
+            self.db.commit()
+        finally:
+            self.db.execute("DETACH DATABASE other")
+
+    def export_parquet(self):
+        if pa is None:
+            print("[WARN] pyarrow is not installed, skipping the Parquet entity tables")
+            return 0
+        for table, (filename, schema) in export_tables().items():
+            path = os.path.join(self.root, filename)
+            cursor = self.db.execute(f"SELECT {', '.join(schema.names)} FROM {table}")
+            with pq.ParquetWriter(path + ".part", schema) as writer:
+                while True:
+                    rows = cursor.fetchmany(EXPORT_BATCH_ROWS)
+                    if not rows:
+                        break
+                    writer.write_table(pa.Table.from_pylist([dict(zip(schema.names, row)) for row in rows], schema))
+            os.replace(path + ".part", path)
+        return len(export_tables())
+
+    def counts(self):
+        return {table: self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("authors", "affiliations", "refs", "article_refs")}
+
+    def summary(self):
+        counts = self.counts()
+        dois = self.db.execute("SELECT COUNT(*) FROM refs WHERE doi IS NOT NULL").fetchone()[0]
+        lookups = self.hits + self.misses
+        return (f"{counts['authors']} ORCID authors" + (f" ({self.hits / lookups:.0%} cache hits)" if lookups else "")
+                + f", {counts['affiliations']} affiliations, {counts['refs']} references ({dois} with DOI) "
+                f"for {counts['article_refs']} citations"
+                + (f", {self.shared} of {self.citations} this run already known" if self.citations else ""))
+
+    def close(self):
+        self.db.close()
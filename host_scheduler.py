@@ -0,0 +1,115 @@
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 60.0
+RETRY_AFTER_MAX = 300.0
+LATENCY_TARGET = 5.0
+DECREASE_COOLDOWN = 1.0
+
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), RETRY_AFTER_MAX)
+    try:
+        when = email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return min(max(when - time.time(), 0.0), RETRY_AFTER_MAX)
+
+
+class HostState:
+    def __init__(self, rate, burst, max_concurrency):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.refilled = time.monotonic()
+        self.paused_until = 0.0
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.latency = None
+        self.last_decrease = 0.0
+        self.cond = threading.Condition()
+
+
+class HostScheduler:
+    def __init__(self, rate, max_concurrency=8, burst=None, max_retries=MAX_RETRIES, rng=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate or 1.0)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.rng = rng or random.Random()
+        self.hosts = {}
+        self.lock = threading.Lock()
+        self.retries = 0
+        self.throttled = 0
+        self.errors = 0
+
+    def host(self, url):
+        netloc = urlparse(url).netloc
+        with self.lock:
+            state = self.hosts.get(netloc)
+            if state is None:
+                state = self.hosts[netloc] = HostState(self.rate, self.burst, self.max_concurrency)
+            return state
+
+    def acquire(self, url):
+        state = self.host(url)
+        with state.cond:
+            while True:
+                now = time.monotonic()
+                wait = state.paused_until - now
+                if state.rate:
+                    state.tokens = min(state.burst, state.tokens + (now - state.refilled) * state.rate)
+                    state.refilled = now
+                    if state.tokens < 1:
+                        wait = max(wait, (1 - state.tokens) / state.rate)
+                if wait <= 0 and state.in_flight < max(1, int(state.limit)):
+                    if state.rate:
+                        state.tokens -= 1
+                    state.in_flight += 1
+                    return state
+                state.cond.wait(wait if wait > 0 else None)
+
+    def release(self, state, status, latency, retry_after=None):
+        now = time.monotonic()
+        with state.cond:
+            state.in_flight -= 1
+            state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+            congested = status is None or status in THROTTLE_STATUSES or state.latency > LATENCY_TARGET
+            if retry_after:
+                state.paused_until = max(state.paused_until, now + retry_after)
+            if congested:
+                if now - state.last_decrease > DECREASE_COOLDOWN:
+                    state.limit = max(1.0, state.limit / 2)
+                    state.last_decrease = now
+            elif status is not None and status < 500:
+                state.limit = min(float(self.max_concurrency), state.limit + 1 / state.limit)
+            state.cond.notify_all()
+        with self.lock:
+            if status is None:
+                self.errors += 1
+            elif status in THROTTLE_STATUSES:
+                self.throttled += 1
+
+    def backoff(self, attempt, retry_after=None):
+        with self.lock:
+            self.retries += 1
+        if retry_after is not None:
+            return retry_after
+        return self.rng.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def summary(self):
+        limits = ", ".join(f"{host} x{state.limit:.1f}" for host, state in sorted(self.hosts.items()))
+        return (f"{self.retries} retries, {self.throttled} throttled (429/503), {self.errors} connection errors"
+                + (f" | concurrency {limits}" if limits else ""))
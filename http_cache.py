@@ -0,0 +1,134 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+CACHE_DIRNAME = ".http_cache"
+
+
+class HTTPCache:
+    def __init__(self, root, max_bytes):
+        self.dir = os.path.join(root, CACHE_DIRNAME)
+        os.makedirs(self.dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(self.dir, "index.sqlite3"), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                digest TEXT
+            )
+        """)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(entries)")}
+        if "digest" not in columns:
+            self.db.execute("ALTER TABLE entries ADD COLUMN digest TEXT")
+        self.db.commit()
+
+    def body_path(self, url):
+        return os.path.join(self.dir, hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    def conditional_headers(self, url):
+        with self.lock:
+            row = self.db.execute("SELECT etag, last_modified, digest FROM entries WHERE url = ?", (url,)).fetchone()
+        if not row or not row[2] and not os.path.exists(self.body_path(url)):
+            return {}
+        headers = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def hit(self, url):
+        with self.lock:
+            self.hits += 1
+            self.db.execute("UPDATE entries SET last_used = ? WHERE url = ?", (time.time(), url))
+            self.db.commit()
+
+    def miss(self):
+        with self.lock:
+            self.misses += 1
+
+    def read(self, url):
+        self.hit(url)
+        with open(self.body_path(url), "rb") as f:
+            return f.read()
+
+    def copy_to(self, url, file_path):
+        self.hit(url)
+        shutil.copyfile(self.body_path(url), file_path)
+        return os.path.getsize(file_path)
+
+    def blob_digest(self, url):
+        with self.lock:
+            row = self.db.execute("SELECT digest FROM entries WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def store(self, url, headers, data=None, file_path=None, digest=None):
+        self.miss()
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        if digest:
+            try:
+                os.remove(self.body_path(url))
+            except FileNotFoundError:
+                pass
+            with self.lock:
+                self.db.execute("""
+                    INSERT OR REPLACE INTO entries (url, etag, last_modified, size, last_used, digest)
+                    VALUES (?, ?, ?, 0, ?, ?)
+                """, (url, etag, last_modified, time.time(), digest))
+                self.db.commit()
+            return
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            if file_path:
+                with open(file_path, "rb") as src:
+                    shutil.copyfileobj(src, f)
+            else:
+                f.write(data)
+        os.replace(tmp_path, self.body_path(url))
+        size = os.path.getsize(self.body_path(url))
+
+        with self.lock:
+            self.db.execute("""
+                INSERT OR REPLACE INTO entries (url, etag, last_modified, size, last_used, digest)
+                VALUES (?, ?, ?, ?, ?, NULL)
+            """, (url, etag, last_modified, size, time.time()))
+            self.db.commit()
+        self.evict()
+
+    def evict(self):
+        with self.lock:
+            total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for url, size in self.db.execute("SELECT url, size FROM entries ORDER BY last_used").fetchall():
+                try:
+                    os.remove(self.body_path(url))
+                except FileNotFoundError:
+                    pass
+                self.db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,270 @@
+import bisect
+import cProfile
+import functools
+import glob
+import io
+import itertools
+import json
+import math
+import os
+import pstats
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+PREFIX = "ojs_crawl_"
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SNAPSHOT_FILENAME = "metrics.json"
+PROFILE_DIRNAME = "profiles"
+PROFILE_REPORT_LINES = 30
+
+
+def peak_rss():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def label_text(labels):
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}" if labels else ""
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, n in zip(self.buckets + (math.inf,), self.counts):
+            if n and seen + n >= rank:
+                return min(lower + (min(bound, self.max) - lower) * (rank - seen) / n, self.max)
+            seen += n
+            lower = bound
+        return 0.0
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.sources = []
+        self.started = time.monotonic()
+
+    def inc(self, name, n=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def value(self, name, **labels):
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def add_gauge(self, name, n, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.gauges[key] = self.gauges.get(key, 0) + n
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def track(self, stage):
+        self.add_gauge("in_flight", 1, stage=stage)
+        try:
+            yield
+        finally:
+            self.add_gauge("in_flight", -1, stage=stage)
+
+    @contextmanager
+    def stage(self, stage):
+        started = time.perf_counter()
+        with self.track(stage):
+            try:
+                yield
+            finally:
+                self.observe(stage, time.perf_counter() - started)
+
+    def call(self, stage, fn, *args):
+        with self.stage(stage):
+            return fn(*args)
+
+    def add_source(self, fn):
+        self.sources.append(fn)
+
+    def source_values(self):
+        values = {}
+        for source in self.sources:
+            values.update((name, value) for name, value in source().items()
+                          if isinstance(value, (int, float)) and not isinstance(value, bool))
+        return values
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "uptime": time.monotonic() - self.started,
+                "counters": {name + label_text(labels): value for (name, labels), value in self.counters.items()},
+                "in_flight": {dict(labels)["stage"]: value for (name, labels), value in self.gauges.items()
+                              if name == "in_flight"},
+                "stages": {stage: {"count": h.count, "sum": h.sum, "p50": h.quantile(0.5),
+                                   "p90": h.quantile(0.9), "p99": h.quantile(0.99), "max": h.max}
+                           for stage, h in self.histograms.items()},
+                "run": self.source_values(),
+            }
+
+    def prometheus(self):
+        lines = []
+        with self.lock:
+            last = None
+            for (name, labels), value in sorted(self.counters.items()):
+                if name != last:
+                    lines.append(f"# TYPE {PREFIX}{name} counter")
+                    last = name
+                lines.append(f"{PREFIX}{name}{label_text(labels)} {value}")
+            lines.append(f"# TYPE {PREFIX}in_flight gauge")
+            for (name, labels), value in sorted(self.gauges.items()):
+                lines.append(f"{PREFIX}{name}{label_text(labels)} {value}")
+            lines.append(f"# TYPE {PREFIX}stage_seconds histogram")
+            for stage, h in sorted(self.histograms.items()):
+                cumulative = itertools.accumulate(h.counts)
+                for bound, n in zip(h.buckets + ("+Inf",), cumulative):
+                    lines.append(f'{PREFIX}stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {n}')
+                lines.append(f'{PREFIX}stage_seconds_sum{{stage="{stage}"}} {h.sum}')
+                lines.append(f'{PREFIX}stage_seconds_count{{stage="{stage}"}} {h.count}')
+            for name, value in sorted(self.source_values().items()):
+                lines.append(f"# TYPE {PREFIX}{name} gauge")
+                lines.append(f"{PREFIX}{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path):
+        tmp_path = path + ".part"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def summary(self):
+        with self.lock:
+            return [f"{stage:<10} n={h.count:<6} p50 {h.quantile(0.5) * 1000:>7.1f} ms  "
+                    f"p99 {h.quantile(0.99) * 1000:>7.1f} ms  total {h.sum:.1f}s"
+                    for stage, h in sorted(self.histograms.items(), key=lambda item: -item[1].sum)]
+
+
+class MetricsExporter:
+    def __init__(self, registry, port=None, snapshot_path=None, interval=0.0):
+        self.registry = registry
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.server = None
+        self.thread = None
+
+        if port is not None:
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    body = registry.prometheus().encode("utf-8")
+                    self.send_response(200 if self.path.split("?")[0] in ("/", "/metrics") else 404)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+            print(f"Metrics at http://127.0.0.1:{self.server.server_address[1]}/metrics")
+
+        if snapshot_path and interval:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.registry.write_snapshot(self.snapshot_path)
+            except OSError as e:
+                print(f"[WARN] Couldn't write metrics snapshot: {e}")
+
+    def close(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.snapshot_path:
+            self.registry.write_snapshot(self.snapshot_path)
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def profiled(path, fn, *args):
+    profile = cProfile.Profile()
+    try:
+        return profile.runcall(fn, *args)
+    finally:
+        profile.dump_stats(path)
+
+
+class Profiler:
+    def __init__(self, root=None, every=0):
+        self.every = every
+        self.dir = os.path.join(root, PROFILE_DIRNAME) if root and every else None
+        self.seen = itertools.count()
+        self.sampled = set()
+        if self.dir:
+            os.makedirs(self.dir, exist_ok=True)
+
+    def sample(self, article_id):
+        if self.dir and next(self.seen) % self.every == 0:
+            self.sampled.add(article_id)
+
+    def wrap(self, article_id, stage, fn):
+        if article_id not in self.sampled:
+            return fn
+        return functools.partial(profiled, os.path.join(self.dir, f"{article_id}-{stage}.prof"), fn)
+
+    def close(self):
+        if not self.dir:
+            return None
+        paths = sorted(glob.glob(os.path.join(self.dir, "*.prof")))
+        if not paths:
+            return None
+        report = io.StringIO()
+        stats = pstats.Stats(*paths, stream=report)
+        stats.sort_stats("cumulative").print_stats(PROFILE_REPORT_LINES)
+        report_path = os.path.join(self.dir, "report.txt")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
+        return f"{len(self.sampled)} articles, {len(paths)} stage profiles, report in {report_path}"
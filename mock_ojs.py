@@ -0,0 +1,384 @@
+import argparse
+import glob
+import hashlib
+import html
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from xml.sax.saxutils import escape
+
+
+LIVE_BASE_URL = "https://revistas.udca.edu.co"
+ARTICLE_PATH = "/index.php/ruadc/article/view/{}"
+
+VIEW_RE = re.compile(r"^/index\.php/ruadc/article/view/(\d+)/?$")
+OAI_PATH = "/index.php/ruadc/oai"
+ARCHIVE_PATH = "/index.php/ruadc/issue/archive"
+ISSUE_RE = re.compile(r"^/index\.php/ruadc/issue/view/(\d+)/?$")
+DOWNLOAD_RE = re.compile(r"^/index\.php/ruadc/article/download/(\d+)/(\d+)/?$")
+RANGE_RE = re.compile(r"^bytes=(\d+)-$")
+YEAR_RE = re.compile(rb"\b202[45]\b")
+DC_META_RE = re.compile(rb'<meta content="([^"]*)" name="DC\.([\w.]+)"')
+GALLEY_LINK_RE = re.compile(rb'obj_galley_link (\w+)" href="[^"]*(/index\.php/ruadc/article/view/\d+/\d+)"')
+GALLEY_FORMATS = {b"pdf": "application/pdf"}
+GALLEY_PATH_RE = re.compile(rb"(/index\.php/ruadc/article/(?:view|download)/)\d+/(\d+)")
+TITLE_META_RE = re.compile(rb'<meta content="([^"]+)" name="citation_title"')
+REFERENCES_OPEN = b'<div class="article-references-content">'
+DC_FIELDS = (
+    ("Title", "title"), ("Creator.PersonalName", "creator"), ("Subject", "subject"),
+    ("Description", "description"), ("Date.issued", "date"), ("Identifier.DOI", "identifier"),
+)
+LAST_MODIFIED = "Tue, 14 Jan 2025 00:00:00 GMT"
+CHALLENGE_PAGE = (b"<!DOCTYPE html><html><head><title>Just a moment...</title></head>"
+                  b"<body><noscript>Enable JavaScript and cookies to continue</noscript></body></html>")
+
+
+def load_fixtures(root="."):
+    fixtures = []
+    for page_path in sorted(glob.glob(os.path.join(root, "*", "*", "*", "page.html"))):
+        folder = os.path.dirname(page_path)
+        with open(page_path, "rb") as f:
+            page = f.read()
+        pdfs = {}
+        for pdf_path in glob.glob(os.path.join(folder, "*.pdf")):
+            galley_id = os.path.splitext(os.path.basename(pdf_path))[0]
+            with open(pdf_path, "rb") as f:
+                pdfs[galley_id] = f.read()
+        fixtures.append((page, pdfs))
+    return fixtures
+
+
+def dc_record(page, base_url):
+    fields = []
+    for content, name in DC_META_RE.findall(page):
+        element = dict(DC_FIELDS).get(name.decode())
+        if not element:
+            continue
+        value = html.unescape(content.decode("utf-8"))
+        if element == "creator" and " " in value:
+            given, family = value.rsplit(" ", 1)
+            value = f"{family}, {given}"
+        fields.append(f"<dc:{element}>{escape(value)}</dc:{element}>")
+    galleys = {}
+    for kind, path in GALLEY_LINK_RE.findall(page):
+        galleys.setdefault(path, kind)
+    for kind in galleys.values():
+        fields.append(f"<dc:format>{GALLEY_FORMATS.get(kind, 'application/octet-stream')}</dc:format>")
+    for path in galleys:
+        fields.append(f"<dc:relation>{base_url}{path.decode()}</dc:relation>")
+    return "".join(fields)
+
+
+class MockOJSServer:
+    def __init__(self, article_ids, fixtures=None, latency=0.0, out_of_year_ids=(), challenge_cookie=None,
+                 interrupt_pdfs=False, oai_page_size=100, throttle_rate=0.0, retry_after=None, reset_rate=0.0,
+                 synthetic=False, pdf_bytes=0, page_bytes=0, revised_ids=(), seed=0, host="127.0.0.1", port=0):
+        self.fixtures = fixtures if fixtures is not None else load_fixtures(os.path.dirname(os.path.abspath(__file__)))
+        if not self.fixtures:
+            raise RuntimeError("No page.html fixtures found")
+        self.article_ids = set(article_ids)
+        self.out_of_year_ids = set(out_of_year_ids)
+        self.served_ids = self.article_ids | self.out_of_year_ids
+        self.latency = latency
+        self.challenge_cookie = challenge_cookie
+        self.interrupt_pdfs = interrupt_pdfs
+        self.interrupted = set()
+        self.oai_page_size = oai_page_size
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.reset_rate = reset_rate
+        self.synthetic = synthetic
+        self.pdf_bytes = pdf_bytes
+        self.padded_pdfs = {}
+        self.page_bytes = page_bytes
+        self.padded_pages = {}
+        self.revised_ids = set(revised_ids)
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.throttled = 0
+        self.resets = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self.handler_class())
+        self.server.daemon_threads = True
+        self.base_url = f"http://{host}:{self.server.server_address[1]}"
+        self.pdfs = {}
+        self.pages = []
+        self.titles = []
+        self.old_pages = []
+        self.dc_records = []
+        self.old_dc_records = []
+        for page, pdfs in self.fixtures:
+            page = page.replace(LIVE_BASE_URL.encode(), self.base_url.encode())
+            self.pages.append(page)
+            title = TITLE_META_RE.search(page)
+            self.titles.append(title.group(1) if title else None)
+            self.old_pages.append(YEAR_RE.sub(b"2019", page))
+            self.dc_records.append(dc_record(page, self.base_url))
+            self.old_dc_records.append(dc_record(self.old_pages[-1], self.base_url))
+            self.pdfs.update(pdfs)
+        self.thread = None
+
+    @property
+    def url_template(self):
+        return self.base_url + ARTICLE_PATH
+
+    def page_for(self, article_id):
+        pages = self.old_pages if article_id in self.out_of_year_ids else self.pages
+        page = pages[article_id % len(pages)]
+        title = self.titles[article_id % len(pages)]
+        if self.page_bytes > len(page):
+            page = self.padded_page(page)
+        if title and article_id in self.revised_ids:
+            page = page.replace(title, title + b" (revised)")
+        if not self.synthetic:
+            return page
+        if title:
+            page = page.replace(title, title + b" %d" % article_id)
+        return GALLEY_PATH_RE.sub(lambda m: m.group(1) + b"%d/%d%s" % (article_id, article_id, m.group(2)), page)
+
+    def padded_page(self, page):
+        with self.lock:
+            if id(page) not in self.padded_pages:
+                references = []
+                size = len(page)
+                while size < self.page_bytes:
+                    n = len(references)
+                    references.append(b"<p>AUTHOR%d, A.; OTHER, B. 2020. Synthetic reference number %d for a long "
+                                      b"reference list. Journal of Tests. %d(2):1-10. <a href=\"https://doi.org/"
+                                      b"10.0000/mock.%d\">https://doi.org/10.0000/mock.%d</a></p>\n"
+                                      % (n % 97, n, n % 40, n, n))
+                    size += len(references[-1])
+                self.padded_pages[id(page)] = page.replace(REFERENCES_OPEN, REFERENCES_OPEN + b"".join(references), 1)
+            return self.padded_pages[id(page)]
+
+    def pdf_for(self, article_id, galley_id):
+        if self.synthetic and galley_id.startswith(article_id) and galley_id[len(article_id):] in self.pdfs:
+            base_id = galley_id[len(article_id):]
+        elif not self.synthetic and galley_id in self.pdfs:
+            base_id = galley_id
+        else:
+            return None
+        pdf = self.pdfs[base_id]
+        if self.pdf_bytes > len(pdf):
+            with self.lock:
+                if base_id not in self.padded_pdfs:
+                    filler = hashlib.sha256(pdf).digest() * ((self.pdf_bytes - len(pdf)) // 32 + 1)
+                    self.padded_pdfs[base_id] = pdf + b"\n%" + filler[:self.pdf_bytes - len(pdf) - 2]
+                pdf = self.padded_pdfs[base_id]
+        if self.synthetic:
+            header, _, rest = pdf.partition(b"\n")
+            pdf = header + b"\n%mock galley " + galley_id.encode() + b"\n" + rest
+        return pdf
+
+    def datestamps(self):
+        stamps = [(article_id, "2024-06-01") for article_id in self.article_ids]
+        stamps += [(article_id, "2019-06-01") for article_id in self.out_of_year_ids - self.article_ids]
+        return sorted(stamps)
+
+    def dc_record_for(self, article_id):
+        if self.synthetic:
+            return dc_record(self.page_for(article_id), self.base_url)
+        records = self.old_dc_records if article_id in self.out_of_year_ids else self.dc_records
+        return records[article_id % len(records)]
+
+    def oai_response(self, query):
+        verb = query.get("verb", ["ListIdentifiers"])[0]
+        token = query.get("resumptionToken", [""])[0]
+        if token:
+            offset, from_date, until_date = token.split(":")
+            offset = int(offset)
+        else:
+            offset = 0
+            from_date = query.get("from", [""])[0]
+            until_date = query.get("until", [""])[0]
+
+        matches = [(article_id, stamp) for article_id, stamp in self.datestamps()
+                   if (not from_date or stamp >= from_date) and (not until_date or stamp <= until_date)]
+        if not matches:
+            body = '<error code="noRecordsMatch">No matching records</error>'
+        else:
+            entries = []
+            for article_id, stamp in matches[offset:offset + self.oai_page_size]:
+                header = (f"<header><identifier>oai:mock.ojs:article/{article_id}</identifier>"
+                          f"<datestamp>{stamp}</datestamp><setSpec>ruadc</setSpec></header>")
+                if verb == "ListRecords":
+                    header = (f"<record>{header}<metadata>"
+                              f'<oai_dc:dc xmlns:oai_dc="http://www.openarchives.org/OAI/2.0/oai_dc/" '
+                              f'xmlns:dc="http://purl.org/dc/elements/1.1/">'
+                              f"<dc:identifier>{self.url_template.format(article_id)}</dc:identifier>"
+                              f"{self.dc_record_for(article_id)}</oai_dc:dc></metadata></record>")
+                entries.append(header)
+            next_offset = offset + self.oai_page_size
+            next_token = f"{next_offset}:{from_date}:{until_date}" if next_offset < len(matches) else ""
+            body = (f"<{verb}>{''.join(entries)}"
+                    f'<resumptionToken completeListSize="{len(matches)}">{next_token}</resumptionToken>'
+                    f"</{verb}>")
+        return (f'<?xml version="1.0" encoding="UTF-8"?>'
+                f'<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">'
+                f"<responseDate>2025-01-14T00:00:00Z</responseDate>{body}</OAI-PMH>").encode()
+
+    def archive_page(self, number):
+        issue_path = self.base_url + "/index.php/ruadc/issue/view/{}"
+        if number == 1:
+            links = (f'<a class="title" href="{issue_path.format(1)}">Vol. 27 Núm. 2 (2024)</a>'
+                     f'<a href="{self.base_url}{ARCHIVE_PATH}/2">Siguiente</a>')
+        else:
+            links = f'<a class="title" href="{issue_path.format(2)}">Vol. 22 Núm. 1 (2019)</a>'
+        return f"<html><body>{links}</body></html>".encode()
+
+    def issue_toc(self, number):
+        ids = self.article_ids if number == 1 else self.out_of_year_ids - self.article_ids
+        links = "".join(f'<a href="{self.url_template.format(article_id)}">Article {article_id}</a>'
+                        for article_id in sorted(ids))
+        return f"<html><body>{links}</body></html>".encode()
+
+    def handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with mock.lock:
+                    mock.requests += 1
+                    roll = mock.rng.random()
+                    throttle = roll < mock.throttle_rate
+                    reset = not throttle and roll < mock.throttle_rate + mock.reset_rate
+                    mock.throttled += throttle
+                    mock.resets += reset
+                if mock.latency:
+                    time.sleep(mock.latency)
+
+                if reset:
+                    self.close_connection = True
+                    return
+                if throttle:
+                    self.send_response(429)
+                    if mock.retry_after is not None:
+                        self.send_header("Retry-After", str(mock.retry_after))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                if mock.challenge_cookie and f"{mock.challenge_cookie}=" not in self.headers.get("Cookie", ""):
+                    return self.reply(403, CHALLENGE_PAGE, "text/html; charset=utf-8")
+
+                match = VIEW_RE.match(self.path)
+                if match and int(match.group(1)) in mock.served_ids:
+                    return self.reply(200, mock.page_for(int(match.group(1))), "text/html; charset=utf-8")
+
+                path, _, query = self.path.partition("?")
+                if path == OAI_PATH:
+                    return self.reply(200, mock.oai_response(parse_qs(query)), "text/xml; charset=utf-8")
+                if path.rstrip("/") in (ARCHIVE_PATH, ARCHIVE_PATH + "/1"):
+                    return self.reply(200, mock.archive_page(1), "text/html; charset=utf-8")
+                if path.rstrip("/") == ARCHIVE_PATH + "/2":
+                    return self.reply(200, mock.archive_page(2), "text/html; charset=utf-8")
+                match = ISSUE_RE.match(path)
+                if match and match.group(1) in ("1", "2"):
+                    return self.reply(200, mock.issue_toc(int(match.group(1))), "text/html; charset=utf-8")
+
+                match = DOWNLOAD_RE.match(self.path)
+                pdf = mock.pdf_for(match.group(1), match.group(2)) if match else None
+                if pdf is not None:
+                    with mock.lock:
+                        interrupt = mock.interrupt_pdfs and self.path not in mock.interrupted
+                        mock.interrupted.add(self.path)
+                    return self.reply(200, pdf, "application/pdf", interrupt)
+
+                self.reply(404, b"Not Found", "text/plain")
+
+            def reply(self, status, body, content_type, interrupt=False):
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                total = len(body)
+                range_match = RANGE_RE.match(self.headers.get("Range", ""))
+                if self.headers.get("If-Range") not in (None, etag, LAST_MODIFIED):
+                    range_match = None
+                if status == 200 and range_match:
+                    start = int(range_match.group(1))
+                    if start >= total:
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{total}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    status, body = 206, body[start:]
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if status == 206:
+                    self.send_header("Content-Range", f"bytes {start}-{total - 1}/{total}")
+                if status in (200, 206):
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", LAST_MODIFIED)
+                    self.send_header("Accept-Ranges", "bytes")
+                self.end_headers()
+                if interrupt:
+                    self.wfile.write(body[:len(body) // 2])
+                    self.close_connection = True
+                    return
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve canned OJS article pages for local crawl runs.")
+    parser.add_argument("--start", type=int, default=2000)
+    parser.add_argument("--end", type=int, default=2100)
+    parser.add_argument("--every", type=int, default=3, help="serve a page for every Nth ID, 404 for the rest")
+    parser.add_argument("--out-of-year-every", type=int, default=0,
+                        help="serve a 2019-dated page for every Nth ID (offset by one)")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--reset-rate", type=float, default=0.0,
+                        help="fraction of requests whose connection is dropped without a response")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="give every article its own title and PDF instead of repeating the fixtures verbatim")
+    parser.add_argument("--pdf-mb", type=float, default=0.0, help="pad served PDFs to this size")
+    parser.add_argument("--page-mb", type=float, default=0.0,
+                        help="pad article pages to this size with extra references")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    ids = range(args.start, args.end + 1, args.every)
+    old_ids = range(args.start + 1, args.end + 1, args.out_of_year_every) if args.out_of_year_every else ()
+    mock = MockOJSServer(ids, latency=args.latency, out_of_year_ids=old_ids, throttle_rate=args.throttle_rate,
+                         retry_after=args.retry_after, reset_rate=args.reset_rate, synthetic=args.synthetic,
+                         pdf_bytes=int(args.pdf_mb * 1024 ** 2), page_bytes=int(args.page_mb * 1024 ** 2),
+                         port=args.port)
+    print(f"Serving {len(ids)} articles at {mock.url_template}")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        mock.stop()
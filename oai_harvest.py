@@ -0,0 +1,99 @@
+import re
+from urllib.parse import urlencode
+
+from lxml import etree
+
+from discovery import OAI_ARTICLE_RE, DiscoveryError
+
+
+OAI = "{http://www.openarchives.org/OAI/2.0/}"
+OAI_DC = "{http://www.openarchives.org/OAI/2.0/oai_dc/}"
+DC = "{http://purl.org/dc/elements/1.1/}"
+RECORD_TAG = OAI + "record"
+TOKEN_TAG = OAI + "resumptionToken"
+ERROR_TAG = OAI + "error"
+DOI_RE = re.compile(r"\b10\.\d{4,9}/\S+")
+GALLEY_RE = re.compile(r"/article/view/\d+/\d+$")
+PDF_FORMAT = "application/pdf"
+
+
+def list_records_url(oai_url, from_date=None, until_date=None, token=None):
+    if token:
+        params = {"verb": "ListRecords", "resumptionToken": token}
+    else:
+        params = {"verb": "ListRecords", "metadataPrefix": "oai_dc"}
+        if from_date:
+            params["from"] = from_date
+        if until_date:
+            params["until"] = until_date
+    return f"{oai_url}?{urlencode(params)}"
+
+
+def dc_values(dc, name):
+    return [text.strip() for text in (node.text for node in dc.iterfind(DC + name)) if text and text.strip()]
+
+
+def record_galleys(dc):
+    galleys = [href for href in dc_values(dc, "relation") if GALLEY_RE.search(href)]
+    formats = dc_values(dc, "format")
+    if len(formats) != len(galleys):
+        return galleys
+    return [href for _, href in sorted(zip(formats, galleys), key=lambda pair: pair[0] != PDF_FORMAT)]
+
+
+def creator_name(creator):
+    family, sep, given = creator.partition(", ")
+    return f"{given} {family}" if sep else creator
+
+
+def record_metadata(dc, article_id, years, journal):
+    dates = dc_values(dc, "date")
+    year = dates[0][:4] if dates else ""
+    if year not in years:
+        return None
+
+    doi = next((match.group(0) for match in map(DOI_RE.search, dc_values(dc, "identifier")) if match), "")
+    titles = dc_values(dc, "title")
+    descriptions = dc_values(dc, "description")
+    return {
+        "title": titles[0] if titles else "",
+        "authors": [(creator_name(creator), "", "") for creator in dc_values(dc, "creator")],
+        "doi": f"https://doi.org/{doi}" if doi else "",
+        "keywords": "|".join(dc_values(dc, "subject")),
+        "abstract": descriptions[0] if descriptions else "",
+        "year": year,
+        "journal": journal,
+        "job_id": article_id,
+        "references": "",
+    }
+
+
+def parse_records(chunks, years, journal):
+    parser = etree.XMLPullParser(events=("end",), tag=(RECORD_TAG, TOKEN_TAG, ERROR_TAG))
+    records = []
+    token = None
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, node in parser.read_events():
+            if node.tag == ERROR_TAG:
+                if node.get("code") == "noRecordsMatch":
+                    return [], None
+                raise DiscoveryError(f"OAI error {node.get('code')}: {node.text}")
+            if node.tag == TOKEN_TAG:
+                token = (node.text or "").strip() or None
+                continue
+
+            header = node.find(OAI + "header")
+            match = OAI_ARTICLE_RE.search(header.findtext(OAI + "identifier", "")) if header is not None else None
+            if match and header.get("status") != "deleted":
+                article_id = int(match.group(1))
+                dc = node.find(f"{OAI}metadata/{OAI_DC}dc")
+                metadata = record_metadata(dc, article_id, years, journal) if dc is not None else None
+                galleys = record_galleys(dc) if metadata else []
+                records.append((article_id, metadata, galleys))
+
+            node.clear()
+            while node.getprevious() is not None:
+                del node.getparent()[0]
+    parser.close()
+    return records, token
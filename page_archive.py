@@ -0,0 +1,129 @@
+import base64
+import gzip
+import hashlib
+import io
+import os
+import tarfile
+import threading
+import time
+import uuid
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+ARCHIVE_MODES = ("file", "tar", "warc", "html", "off")
+ARCHIVE_CODECS = ("gzip", "zstd")
+ARCHIVE_DIRNAME = "archive"
+SHARD_BYTES = 1024 ** 3
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+
+def compress(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data), ".zst"
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0), ".gz"
+
+
+def warc_record(record_type, headers, block):
+    lines = [
+        "WARC/1.1",
+        f"WARC-Type: {record_type}",
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+        f"WARC-Date: {time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}",
+    ]
+    lines += [f"{name}: {value}" for name, value in headers]
+    lines.append(f"WARC-Block-Digest: sha1:{base64.b32encode(hashlib.sha1(block).digest()).decode()}")
+    lines.append(f"Content-Length: {len(block)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8") + block + b"\r\n\r\n"
+
+
+class PageArchive:
+    def __init__(self, root, mode="file", codec="gzip", shard_bytes=SHARD_BYTES):
+        if codec == "zstd" and zstandard is None:
+            print("[WARN] zstandard is not installed, archiving pages with gzip")
+            codec = "gzip"
+        self.mode = mode
+        self.codec = codec
+        self.shard_bytes = shard_bytes
+        self.dir = os.path.join(root, ARCHIVE_DIRNAME)
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self.lock = threading.Lock()
+        self.shard = None
+        self.shard_index = 0
+        self.shard_size = 0
+        self.pages = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def save(self, article_id, url, data, folder, render=None):
+        if self.mode == "html":
+            page = render().encode("utf-8")
+            with open(os.path.join(folder, "page.html"), "wb") as f:
+                f.write(page)
+            stored = len(page)
+        elif self.mode == "warc":
+            record = warc_record("resource", [("WARC-Target-URI", url), ("Content-Type", "text/html")], data)
+            stored = self.append(gzip.compress(record, compresslevel=GZIP_LEVEL), ".warc.gz")
+        else:
+            blob, ext = compress(data, self.codec)
+            if self.mode == "tar":
+                stored = self.append_member(f"{article_id}.html{ext}", blob)
+            else:
+                with open(os.path.join(folder, "page.html" + ext), "wb") as f:
+                    f.write(blob)
+                stored = len(blob)
+
+        with self.lock:
+            self.pages += 1
+            self.raw_bytes += len(data)
+            self.stored_bytes += stored
+
+    def open_shard(self, suffix):
+        if self.shard and self.shard_size < self.shard_bytes:
+            return
+        self.close_shard()
+        os.makedirs(self.dir, exist_ok=True)
+        self.shard_index += 1
+        path = os.path.join(self.dir, f"pages-{self.run_id}-{self.shard_index:05d}{suffix}")
+        if suffix == ".tar":
+            self.shard = tarfile.open(path, "w")
+        else:
+            self.shard = open(path, "ab")
+            self.shard.write(gzip.compress(warc_record(
+                "warcinfo", [("Content-Type", "application/warc-fields")], b"software: sol_23_07_2025.py\r\n"
+            )))
+        self.shard_size = 0
+
+    def append(self, blob, suffix):
+        with self.lock:
+            self.open_shard(suffix)
+            self.shard.write(blob)
+            self.shard_size += len(blob)
+        return len(blob)
+
+    def append_member(self, name, blob):
+        info = tarfile.TarInfo(name)
+        info.size = len(blob)
+        info.mtime = int(time.time())
+        with self.lock:
+            self.open_shard(".tar")
+            self.shard.addfile(info, io.BytesIO(blob))
+            self.shard_size += len(blob) + tarfile.BLOCKSIZE
+        return len(blob)
+
+    def close_shard(self):
+        if self.shard:
+            self.shard.close()
+            self.shard = None
+
+    def close(self):
+        with self.lock:
+            self.close_shard()
+        ratio = self.raw_bytes / self.stored_bytes if self.stored_bytes else 0.0
+        label = self.mode if self.mode in ("html", "warc") else f"{self.mode}/{self.codec}"
+        return (f"{self.pages} pages, {self.raw_bytes / 1024 ** 2:.1f} MB -> {self.stored_bytes / 1024 ** 2:.1f} MB "
+                f"({label}, {ratio:.1f}x)")
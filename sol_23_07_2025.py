@@ -1,14 +1,41 @@
+import argparse
+import asyncio
+import ctypes
+import functools
+import hashlib
+import io
+import itertools
+import json
+import multiprocessing
 import os
 import re
 import shutil
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, Tag
 import urllib3
 from urllib3.util import Timeout
 
 
+import lxml.html
 from lxml import etree
 
+import article_xml
+import blob_store
+import catalog
+import crawl_journal
+import discovery
+import entity_store
+import host_scheduler
+import http_cache
+import metrics
+import oai_harvest
+import page_archive
+import work_queue
+
 ARTICLE_URL_TEMPLATE = "https://revistas.udca.edu.co/index.php/ruadc/article/view/{}"
 
 JOB_ID = "936719006"
@@ -18,21 +45,462 @@ END_ID = 3000
 TARGET_YEARS = {"2024", "2025"}
 HARDCODED_JOURNAL_NAME = "Revista U.D.C.A Actualidad & Divulgación Científica"
 
-http = urllib3.PoolManager()
+PAGE_CONCURRENCY = 8
+PDF_CONCURRENCY = 4
+HOST_RATE_LIMIT = 10.0
+PARSER_BACKEND = "bs4"
+DISCOVERY_METHOD = "auto"
+HARVEST_BACKLOG = 4
+PARSE_WORKERS = 0
+PARSE_BACKLOG = 2
+ARCHIVE_MODE = "file"
+ARCHIVE_CODEC = "gzip"
+HTTP_CACHE_MAX_BYTES = 2 * 1024 ** 3
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_PAGE_BYTES = 32 * 1024 ** 2
+MAX_BUFFERED_BYTES = 256 * 1024 ** 2
+MALLOC_MMAP_THRESHOLD = 1024 ** 2
+M_MMAP_THRESHOLD = -3
+PDF_MAGIC = b"%PDF"
+PROBE_WINDOW = 10
+MAX_PROBE_WINDOWS = 100
+CHANGE_KINDS = ("new", "updated", "unchanged", "withdrawn")
+FINGERPRINT_FIELDS = ("title", "authors", "doi", "keywords", "abstract", "year", "volume", "issue", "journal",
+                      "references")
+YEAR_DIR_RE = re.compile(r"^\d{4}$")
+RUN_COUNTERS = ("checked", "saved", "unchanged", "skipped", "failed", "requests", "prefiltered")
+
+PREFILTER_CHUNK_SIZE = 16 * 1024
+PREFILTER_DRAIN_LIMIT = 256 * 1024
+HEAD_LIMIT = 1024 ** 2
+YEAR_META_NAMES = {b"DC.Date", b"DC.Date.issued", b"citation_date"}
+META_TAG_RE = re.compile(rb"<meta\s[^>]*>", re.I)
+META_ATTR_RE = re.compile(rb"""([\w.:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+HEAD_END_RE = re.compile(rb"</head\s*>", re.I)
+CHALLENGE_RE = re.compile(
+    rb"just a moment|checking your browser|cf-chl|challenge-platform|__jschl|"
+    rb"enable javascript and cookies|verify you are human",
+    re.I,
+)
+
+http = urllib3.PoolManager(maxsize=PAGE_CONCURRENCY + PDF_CONCURRENCY, block=True)
 timeout = Timeout(connect=30.0, read=30.0)
-os.makedirs(ROOT_FOLDER, exist_ok=True)
+no_retries = urllib3.Retry(total=None, connect=0, read=0, other=0, status=0, redirect=5)
+scheduler = host_scheduler.HostScheduler(HOST_RATE_LIMIT, PAGE_CONCURRENCY + PDF_CONCURRENCY)
+cache = None
+blobs = None
+page_budget = None
+max_page_bytes = MAX_PAGE_BYTES
+telemetry = metrics.Metrics()
+request_counter = threading.local()
+
+session = {"generation": 0, "headers": {}}
+session_lock = threading.Lock()
+session_solver = None
+
+
+class ChallengeError(Exception):
+    pass
+
+
+class DownloadError(Exception):
+    pass
+
+
+class IncompleteDownload(DownloadError):
+    pass
+
+
+class PageTooLarge(Exception):
+    pass
+
+
+class ByteBudget:
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+        self.waits = 0
+        self.cond = threading.Condition()
+
+    def acquire(self, n):
+        with self.cond:
+            if self.used and self.used + n > self.limit:
+                self.waits += 1
+                self.cond.wait_for(lambda: not self.used or self.used + n <= self.limit)
+            self.used += n
+            self.peak = max(self.peak, self.used)
+        return n
+
+    def release(self, n):
+        with self.cond:
+            self.used -= n
+            self.cond.notify_all()
+
+    def summary(self):
+        return (f"peak {self.peak / 1024 ** 2:.1f} MB of {self.limit / 1024 ** 2:.0f} MB, "
+                f"{self.waits} pages waited for room")
+
+LXML_HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+
+def head_years(head):
+    end = HEAD_END_RE.search(head)
+    if end:
+        head = head[:end.start()]
+    years = set()
+    for tag in META_TAG_RE.findall(head):
+        attrs = {k.lower(): v1 or v2 for k, v1, v2 in META_ATTR_RE.findall(tag)}
+        if attrs.get(b"name") in YEAR_META_NAMES and attrs.get(b"content"):
+            year = attrs[b"content"].strip()[:4].decode("ascii", "ignore")
+            if year.isdigit():
+                years.add(year)
+    return years
+
+def read_head(r, limit=HEAD_LIMIT):
+    head = bytearray()
+    for chunk in r.stream(PREFILTER_CHUNK_SIZE):
+        start = max(0, len(head) - 16)
+        head += chunk
+        if HEAD_END_RE.search(head, start) or len(head) >= limit:
+            break
+    return bytes(head)
+
+def discard_response(r):
+    remaining = r.length_remaining
+    if remaining is not None and remaining <= PREFILTER_DRAIN_LIMIT:
+        r.drain_conn()
+    else:
+        r.close()
+    r.release_conn()
+
+def counted(fn, *args):
+    request_counter.n = 0
+    result = fn(*args)
+    return result, request_counter.n
+
+def count_bytes(n):
+    telemetry.inc("bytes_received_total", n)
+
+def cache_headers(url):
+    return cache.conditional_headers(url) if cache else None
+
+def request_headers(url, extra=None, conditional=True):
+    headers = dict(session["headers"])
+    if conditional:
+        headers.update(cache_headers(url) or {})
+    headers.update(extra or {})
+    return headers or None
+
+def looks_like_challenge(r, head):
+    if r.status not in (200, 403, 429, 503):
+        return False
+    if not r.headers.get("Content-Type", "").startswith("text/html"):
+        return False
+    return bool(CHALLENGE_RE.search(head)) and b'name="DC.' not in head
 
-def get_soup(url):
+def refresh_session(generation):
+    if session_solver is None:
+        return False
+    with session_lock:
+        if session["generation"] == generation:
+            print("[INFO] JS challenge detected, solving a new browser session...")
+            solved = session_solver()
+            session["headers"] = {
+                "User-Agent": solved["user_agent"],
+                "Cookie": "; ".join(f"{name}={value}" for name, value in solved["cookies"].items()),
+            }
+            session["generation"] += 1
+    return True
+
+def send(url, headers=None, conditional=True):
+    for attempt in range(scheduler.max_retries + 1):
+        state = scheduler.acquire(url)
+        started = time.monotonic()
+        try:
+            with telemetry.stage("request"):
+                r = http.request('GET', url, headers=request_headers(url, headers, conditional),
+                                 timeout=timeout, retries=no_retries, preload_content=False)
+        except urllib3.exceptions.HTTPError as e:
+            scheduler.release(state, None, time.monotonic() - started)
+            telemetry.inc("http_responses_total", status="error")
+            request_counter.n = getattr(request_counter, "n", 0) + 1
+            if attempt == scheduler.max_retries:
+                raise
+            delay = scheduler.backoff(attempt)
+            print(f"[WARN] {url}: {e}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        retry_after = host_scheduler.parse_retry_after(r.headers.get("Retry-After"))
+        scheduler.release(state, r.status, time.monotonic() - started, retry_after)
+        telemetry.inc("http_responses_total", status=str(r.status))
+        request_counter.n = getattr(request_counter, "n", 0) + 1
+        if r.status not in host_scheduler.RETRY_STATUSES or attempt == scheduler.max_retries:
+            return r
+        discard_response(r)
+        delay = scheduler.backoff(attempt, retry_after)
+        print(f"[WARN] {url}: HTTP {r.status}, retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+def check_length(r, url, limit):
+    length = r.headers.get("Content-Length")
+    if limit and length and length.isdigit() and int(length) > limit:
+        discard_response(r)
+        raise PageTooLarge(f"{url} is {int(length) / 1024 ** 2:.1f} MB, over the "
+                           f"{limit / 1024 ** 2:.0f} MB page limit")
+
+def open_url(url, headers=None, conditional=True, limit=None):
+    for attempt in range(2):
+        generation = session["generation"]
+        r = send(url, headers, conditional)
+        if r.status == 304 and cache is not None:
+            return r, b""
+        if r.status == 200:
+            check_length(r, url, limit)
+        if r.headers.get("Content-Type", "").startswith("text/html"):
+            head = read_head(r, min(HEAD_LIMIT, limit or HEAD_LIMIT))
+        else:
+            head = next(r.stream(PREFILTER_CHUNK_SIZE), b"")
+        if not looks_like_challenge(r, head):
+            return r, head
+        discard_response(r)
+        if attempt == 0 and refresh_session(generation):
+            continue
+        raise ChallengeError(f"JS challenge page returned for {url}")
+
+def fetch_bytes(url):
     try:
-        r = http.request('GET', url, timeout=timeout)
+        r, data = open_url(url, conditional=False)
         if r.status != 200:
+            discard_response(r)
             return None
-        return BeautifulSoup(r.data, 'lxml')
+        data += r.read()
+        r.release_conn()
+        count_bytes(len(data))
+        return data
+    except Exception as e:
+        print(f"[ERROR] Couldn't load {url}: {e}")
+        return None
+
+def fetch_oai_records(url):
+    r, head = open_url(url, conditional=False)
+    if r.status != 200:
+        discard_response(r)
+        raise discovery.DiscoveryError(f"HTTP {r.status} for {url}")
+
+    def chunks():
+        for chunk in itertools.chain((head,), r.stream(PREFILTER_CHUNK_SIZE)):
+            count_bytes(len(chunk))
+            yield chunk
+
+    try:
+        return oai_harvest.parse_records(chunks(), TARGET_YEARS, HARDCODED_JOURNAL_NAME)
+    finally:
+        discard_response(r)
+
+def pin_mmap_threshold(threshold=MALLOC_MMAP_THRESHOLD):
+    try:
+        ctypes.CDLL("libc.so.6").mallopt(M_MMAP_THRESHOLD, threshold)
+    except (OSError, AttributeError):
+        pass
+
+def reserve(n):
+    return page_budget.acquire(n) if page_budget else 0
+
+def release_page(page, keep=0):
+    if not page:
+        return
+    keep = min(keep, page.get("reserved", 0))
+    if page.get("reserved") and page_budget:
+        page_budget.release(page["reserved"] - keep)
+    page["reserved"] = keep
+    page["data"] = None
+
+def record_size(record):
+    if not record:
+        return 0
+    metadata = record["metadata"]
+    return (sum(len(value) for value in metadata.values() if isinstance(value, str))
+            + sum(map(len, metadata.get("reference_list", ()))))
+
+def read_body(r, url, data):
+    length = r.headers.get("Content-Length")
+    check_length(r, url, max_page_bytes)
+    reserved = reserve(int(length) if length and length.isdigit() else max_page_bytes)
+    try:
+        data += r.read(max_page_bytes - len(data) + 1)
+        if len(data) > max_page_bytes:
+            discard_response(r)
+            raise PageTooLarge(f"{url} is over the {max_page_bytes / 1024 ** 2:.0f} MB page limit")
+    except BaseException:
+        if page_budget:
+            page_budget.release(reserved)
+        raise
+    r.release_conn()
+    if reserved > len(data):
+        page_budget.release(reserved - len(data))
+        reserved = len(data)
+    return data, reserved
+
+def read_page(url, year_filter=False):
+    try:
+        r, data = open_url(url, limit=max_page_bytes)
+        cached = r.status == 304 and cache is not None
+        if cached:
+            discard_response(r)
+            data = cache.read(url)
+        elif r.status != 200:
+            discard_response(r)
+            return {"url": url, "status": r.status, "data": None, "soup": None, "parse_time": 0.0}
+        if year_filter:
+            years = head_years(data)
+            if years and not years & TARGET_YEARS:
+                if not cached:
+                    discard_response(r)
+                telemetry.inc("year_rejected_total")
+                return {"url": url, "status": 200, "data": None, "soup": None, "parse_time": 0.0,
+                        "year_rejected": True}
+        if cached:
+            reserved = reserve(len(data))
+        else:
+            data, reserved = read_body(r, url, data)
+            count_bytes(len(data))
+            if cache:
+                cache.store(url, r.headers, data=data)
+        return {"url": url, "status": 200, "data": data, "soup": None, "parse_time": 0.0, "reserved": reserved}
+    except PageTooLarge as e:
+        print(f"[ERROR] {e}")
+        telemetry.inc("pages_too_large_total")
+        return {"url": url, "status": 200, "data": None, "soup": None, "parse_time": 0.0, "error": "page too large"}
     except Exception as e:
         print(f"[ERROR] Couldn't load page {url}: {e}")
         return None
 
-def download_file(href, base_url, folder_path):
+def fetch_page(url, year_filter=False, parse=None, raw=False):
+    with telemetry.stage("fetch"):
+        page = read_page(url, year_filter)
+    if raw or not page or page["data"] is None:
+        return page
+    try:
+        with telemetry.stage("parse"):
+            started = time.perf_counter()
+            page["soup"] = parse(page["data"]) if parse else BeautifulSoup(page["data"], 'lxml')
+            page["parse_time"] = time.perf_counter() - started
+    except Exception as e:
+        print(f"[ERROR] Couldn't parse page {url}: {e}")
+        return None
+    finally:
+        release_page(page)
+    return page
+
+def part_validator(validators_path):
+    try:
+        with open(validators_path, encoding="utf-8") as f:
+            validators = json.load(f)
+    except (OSError, ValueError):
+        return None
+    etag = validators.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return validators.get("last_modified")
+
+def save_part_validators(validators_path, headers):
+    with open(validators_path, "w", encoding="utf-8") as f:
+        json.dump({"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified")}, f)
+
+def remove_part(part_path):
+    for path in (part_path, part_path + ".json"):
+        if os.path.exists(path):
+            os.remove(path)
+
+def stream_download(url, file_path, expect_pdf=True):
+    part_path = file_path + ".part"
+    validators_path = part_path + ".json"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    validator = part_validator(validators_path) if offset else None
+    if offset and not validator:
+        remove_part(part_path)
+        offset = 0
+    hasher = hashlib.sha256()
+    if offset:
+        with open(part_path, "rb") as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+
+    range_header = {"Range": f"bytes={offset}-", "If-Range": validator} if offset else None
+    digest = cache.blob_digest(url) if cache and blobs else None
+    response, head = open_url(url, range_header, conditional=not offset and (not digest or blobs.has(digest)))
+    if response.status == 304 and cache and digest:
+        discard_response(response)
+        cache.hit(url)
+        blobs.link(digest, file_path)
+        return os.path.getsize(file_path), digest
+    if response.status == 304 and cache:
+        discard_response(response)
+        size = cache.copy_to(url, part_path)
+        os.replace(part_path, file_path)
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        return size, hasher.hexdigest()
+
+    if response.status == 206 and offset:
+        mode = "ab"
+    elif response.status == 200:
+        mode, offset, hasher = "wb", 0, hashlib.sha256()
+    else:
+        discard_response(response)
+        if response.status == 416 and offset:
+            remove_part(part_path)
+        raise DownloadError(f"HTTP {response.status}")
+
+    if expect_pdf and not offset and not head.startswith(PDF_MAGIC):
+        discard_response(response)
+        raise DownloadError(f"not a PDF (starts with {head[:len(PDF_MAGIC)]!r})")
+
+    content_length = response.headers.get("Content-Length")
+    expected = offset + int(content_length) if content_length and content_length.isdigit() else None
+    if not offset:
+        save_part_validators(validators_path, response.headers)
+
+    with open(part_path, mode) as out_file:
+        for chunk in itertools.chain((head,), response.stream(DOWNLOAD_CHUNK_SIZE)):
+            hasher.update(chunk)
+            out_file.write(chunk)
+            count_bytes(len(chunk))
+    response.release_conn()
+
+    size = os.path.getsize(part_path)
+    if expected is not None and size != expected:
+        raise IncompleteDownload(f"incomplete transfer, {size} of {expected} bytes (kept for resume)")
+    if expect_pdf:
+        with open(part_path, "rb") as f:
+            magic = f.read(len(PDF_MAGIC))
+        if magic != PDF_MAGIC:
+            remove_part(part_path)
+            raise DownloadError(f"not a PDF (starts with {magic!r})")
+
+    os.replace(part_path, file_path)
+    remove_part(part_path)
+    if cache and blobs:
+        cache.store(url, response.headers, digest=hasher.hexdigest())
+    elif cache:
+        cache.store(url, response.headers, file_path=file_path)
+    return size, hasher.hexdigest()
+
+def resumable_download(url, file_path, expect_pdf=True):
+    for attempt in range(scheduler.max_retries + 1):
+        try:
+            return stream_download(url, file_path, expect_pdf)
+        except (IncompleteDownload, urllib3.exceptions.ProtocolError, urllib3.exceptions.ReadTimeoutError) as e:
+            if attempt == scheduler.max_retries:
+                raise DownloadError(f"{e} after {attempt + 1} attempts")
+            delay = scheduler.backoff(attempt)
+            print(f"[WARN] {url}: {e}, resuming in {delay:.1f}s")
+            time.sleep(delay)
+
+def download_file(href, base_url, folder_path, expect_pdf=True, warn=True):
     try:
 
         if "article/view/" in href:
@@ -42,21 +510,26 @@ def download_file(href, base_url, folder_path):
             filename = os.path.basename(pdf_url) + ".pdf"  
             file_path = os.path.join(folder_path, filename)
 
-            response = http.request('GET', pdf_url, preload_content=False, timeout=timeout)
-            if response.status == 200:
-                with open(file_path, 'wb') as out_file:
-                    shutil.copyfileobj(response, out_file)
-                size = os.path.getsize(file_path)
-                response.release_conn()
-                return filename, size
-            else:
-                print(f"[WARN] Direct PDF download failed: {pdf_url}")
-                return None, 0
+            try:
+                if not blobs:
+                    size, digest = resumable_download(pdf_url, file_path, expect_pdf)
+                    return filename, size, digest
+                with blobs.url_lock(pdf_url):
+                    if blobs.lookup(pdf_url):
+                        digest, size = blobs.place(pdf_url, file_path)
+                        return filename, size, digest
+                    size, digest = resumable_download(pdf_url, file_path, expect_pdf)
+                    blobs.ingest(pdf_url, file_path, digest)
+                    return filename, size, digest
+            except DownloadError as e:
+                if warn:
+                    print(f"[WARN] Direct PDF download failed: {pdf_url}: {e}")
+                return None, 0, None
         else:
             print(f"[WARN] Unexpected href format: {href}")
     except Exception as e:
         print(f"[ERROR] Exception during direct PDF download: {e}")
-    return None, 0
+    return None, 0, None
 
 
 
@@ -66,67 +539,24 @@ def sanitize(text):
 def is_valid_folder_name(name):
     return bool(re.match(r'^[\w\s\-.()]+$', name.strip()))
 
-def escape_(text):
-
-    return re.sub(r'&(?!#?\w+;)', '&amp;', text)
-
-def generate_xml(metadata, files_info, folder_path):
-    author_tags = ""
-    for name, affil, orcid in metadata["authors"]:
-        author_tags += f"""        <Author>
-            <Name>{name}</Name>
-            <Affiliation>{affil}</Affiliation>
-            <ORCID>{orcid}</ORCID>
-        </Author>\n"""
-
-    xml_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<Article>
-    <Title>{metadata['title']}</Title>
-    <Authors>{author_tags.strip()}</Authors>
-    <Keywords>{metadata['keywords']}</Keywords>
-    <PDFName>{files_info.get('pdf_name', '')}</PDFName>
-    <FileSize>{files_info.get('pdf_size', 0)}</FileSize>
-    <PublicationYear>{metadata['year']}</PublicationYear>
-    <Volume>{metadata.get('volume', '')}</Volume>
-    <Issue>{metadata.get('issue', '')}</Issue>
-    <SourceID>{metadata['job_id']}</SourceID>
-    <ContentProvider>{HARDCODED_JOURNAL_NAME}</ContentProvider>
-    <DOI>{metadata['doi']}</DOI>
-    <PublisherItemType>Journal Article</PublisherItemType>
-    <StartPage></StartPage>
-    <EndPage></EndPage>
-    <PageRange></PageRange>
-    <Abstract>{metadata['abstract']}</Abstract>
-    <References>{metadata['references']}</References>
-</Article>
-"""
+def generate_xml(metadata, files_info, folder_path, validate=False):
     xml_file_path = os.path.join(folder_path, "metadata.xml")
-    
     try:
-        xml_content = escape_(xml_content)
-        with open(xml_file_path, "w", encoding="utf-8") as f:
-            
-            f.write(xml_content)
-        
-
-        try:
-
-            parser = etree.XMLParser(recover=False)
-            etree.fromstring(xml_content.encode('utf-8'), parser=parser)
-            print(f"Valid XML generated for article {metadata.get('job_id', 'unknown')}")
-        except etree.XMLSyntaxError as e:
-            print(f"XML validation warning for article {metadata.get('job_id', 'unknown')}: {e}")
-
-            
+        article_xml.write_article(xml_file_path, metadata, files_info.get('pdf_name', ''),
+                                  files_info.get('pdf_size', 0), HARDCODED_JOURNAL_NAME)
     except Exception as e:
         print(f"[ERROR] Failed to write XML file: {e}")
         return False
 
-def extract_metadata(article_url, article_id):
-    soup = get_soup(article_url)
-    if not soup:
-        return None
+    if validate:
+        error = article_xml.validate_article(xml_file_path)
+        if error:
+            print(f"XML validation warning for article {metadata.get('job_id', 'unknown')}: {error}")
+        else:
+            print(f"Valid XML generated for article {metadata.get('job_id', 'unknown')}")
+    return True
 
+def extract_metadata(soup, article_id):
 
     title_tag = soup.select_one("span.text-to-voice-body") or soup.find("h1", class_="page-header")
     title = title_tag.text.strip() if title_tag else ""
@@ -164,7 +594,7 @@ def extract_metadata(article_url, article_id):
     abs_div = soup.find("div", class_="article-abstract")
     if abs_div:
         p = abs_div.find("p")
-        abstract = p.text.strip().replace("<", "").replace(">", "") if p else ""
+        abstract = p.text.strip() if p else ""
 
 
     pub_year = None
@@ -203,7 +633,140 @@ def extract_metadata(article_url, article_id):
 
 
     ref_tag = soup.find("div", class_="article-references-content")
-    references = ref_tag.get_text(separator=" ", strip=True) if ref_tag else ""
+    reference_list = reference_entries(ref_tag) if ref_tag else []
+
+    return {
+        "title": title or "",
+        "authors": authors,
+        "doi": doi or "",
+        "keywords": keywords or "",
+        "abstract": abstract or "",
+        "year": pub_year,
+        "journal": HARDCODED_JOURNAL_NAME,
+        "job_id": article_id,
+        "references": " ".join(reference_list),
+        "reference_list": reference_list,
+    }
+
+def reference_entries(ref_tag):
+    entries = []
+    for node in ref_tag.children:
+        if isinstance(node, Tag):
+            text = node.get_text(separator=" ", strip=True) if node.name not in TEXT_SKIP_TAGS else ""
+        else:
+            text = node.strip() if type(node) is NavigableString else ""
+        if text:
+            entries.append(text)
+    return entries
+
+def has_class(cls):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+
+X_TITLE = etree.XPath(f"(//span[{has_class('text-to-voice-body')}])[1] | (//h1[{has_class('page-header')}])[1]")
+X_AUTHORS = etree.XPath(f"//div[{has_class('authors')}]//div[{has_class('author')}]")
+X_AFFILS = etree.XPath(f"//div[{has_class('article-author-affilitation')}]")
+X_STRONG = etree.XPath("(.//strong)[1]")
+X_ORCID = etree.XPath("(.//a[contains(@href, 'orcid.org')])[1]")
+X_DOI = etree.XPath("(//a[contains(@href, 'doi.org')])[1]")
+X_ABSTRACT = etree.XPath(f"(//div[{has_class('article-abstract')}])[1]")
+X_FIRST_P = etree.XPath("(.//p)[1]")
+X_BREADCRUMB = etree.XPath(f"//ol[{has_class('breadcrumb')}]//li")
+X_PUBLISHED = etree.XPath(f"(//div[{has_class('published')}])[1]")
+X_DC_DATE = etree.XPath("(//meta[@name='DC.Date'])[1]")
+X_KEYWORDS = etree.XPath(f"//div[{has_class('keyword-item')}]")
+X_LINKS = etree.XPath(".//a")
+X_REFERENCES = etree.XPath(f"(//div[{has_class('article-references-content')}])[1]")
+X_PDF_LINK = etree.XPath(
+    f"(//a[{has_class('galley-link')} and {has_class('btn')} and {has_class('obj_galley_link')} and {has_class('pdf')}])[1]"
+)
+X_HREFS = etree.XPath("//a/@href")
+TEXT_SKIP_TAGS = {"script", "style", "template"}
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_KEEP = {("span", "text-to-voice-body"), ("h1", "page-header"), ("div", "authors"),
+               ("div", "article-author-affilitation"), ("div", "article-abstract"), ("ol", "breadcrumb"),
+               ("div", "published"), ("div", "keyword-item"), ("div", "article-references-content")}
+PDF_LINK_CLASSES = {"galley-link", "btn", "obj_galley_link", "pdf"}
+
+def node_strings(node):
+    if isinstance(node.tag, str) and node.tag not in TEXT_SKIP_TAGS:
+        if node.text:
+            yield node.text
+        for child in node:
+            yield from node_strings(child)
+            if child.tail:
+                yield child.tail
+
+def node_text(node, separator="", strip=False):
+    if not strip:
+        return separator.join(node_strings(node))
+    return separator.join(s.strip() for s in node_strings(node) if s.strip())
+
+def reference_entries_lxml(node):
+    entries = [node.text.strip()] if node.text and node.text.strip() else []
+    for child in node:
+        text = node_text(child, separator=" ", strip=True)
+        if text:
+            entries.append(text)
+        if child.tail and child.tail.strip():
+            entries.append(child.tail.strip())
+    return entries
+
+def extract_metadata_lxml(tree, article_id):
+    title_tag = X_TITLE(tree)
+    title = node_text(title_tag[0]).strip() if title_tag else ""
+
+    authors = []
+    affil_tags = X_AFFILS(tree)
+    for i, div in enumerate(X_AUTHORS(tree)):
+        strong_tag = X_STRONG(div)
+        name = node_text(strong_tag[0], strip=True) if strong_tag else ""
+        orcid_tag = X_ORCID(div)
+        orcid = orcid_tag[0].get("href", "").strip() if orcid_tag else ""
+        affil = node_text(affil_tags[i], strip=True) if i < len(affil_tags) else ""
+        authors.append((name, affil, orcid))
+
+    doi_tag = X_DOI(tree)
+    doi = node_text(doi_tag[0]).strip() if doi_tag else ""
+
+    abstract = ""
+    abs_div = X_ABSTRACT(tree)
+    if abs_div:
+        p = X_FIRST_P(abs_div[0])
+        abstract = node_text(p[0]).strip() if p else ""
+
+    pub_year = None
+    breadcrumb_items = X_BREADCRUMB(tree)
+    if len(breadcrumb_items) >= 3:
+        vol_text = node_text(breadcrumb_items[2])
+        for y in TARGET_YEARS:
+            if y in vol_text:
+                pub_year = y
+                break
+
+    if not pub_year:
+        pub_tag = X_PUBLISHED(tree)
+        if pub_tag:
+            for part in node_text(pub_tag[0]).strip().split():
+                if part.isdigit() and len(part) == 4 and part in TARGET_YEARS:
+                    pub_year = part
+                    break
+
+    if not pub_year:
+        meta = X_DC_DATE(tree)
+        if meta and meta[0].get("content"):
+            year_candidate = meta[0].get("content")[:4]
+            if year_candidate in TARGET_YEARS:
+                pub_year = year_candidate
+
+    if pub_year not in TARGET_YEARS:
+        return None
+
+    keywords = ""
+    for div in X_KEYWORDS(tree):
+        keywords = "|".join([node_text(a).strip() for a in X_LINKS(div)])
+
+    ref_tag = X_REFERENCES(tree)
+    reference_list = reference_entries_lxml(ref_tag[0]) if ref_tag else []
 
     return {
         "title": title or "",
@@ -214,55 +777,894 @@ def extract_metadata(article_url, article_id):
         "year": pub_year,
         "journal": HARDCODED_JOURNAL_NAME,
         "job_id": article_id,
-        "references": references or ""
+        "references": " ".join(reference_list),
+        "reference_list": reference_list,
     }
 
-def create_article_folder(year, journal, title, article_id):    
+def create_article_folder(year, journal, title, article_id, root=ROOT_FOLDER):
     safe_journal = sanitize(journal)
     safe_title = sanitize(title)
 
     folder_name = safe_title if safe_title else str(article_id)
-    folder_path = os.path.join(ROOT_FOLDER, year, safe_journal, folder_name)
+    folder_path = os.path.join(root, year, safe_journal, folder_name)
     os.makedirs(folder_path, exist_ok=True)
     return folder_path
 
 
-for article_id in range(START_ID, END_ID + 1):
-    article_url = ARTICLE_URL_TEMPLATE.format(article_id)
-    print(f"\n Checking Article ID: {article_id}")
 
-    metadata = extract_metadata(article_url, article_id)
+def find_pdf_link(soup):
+    pdf_link = soup.select_one("a.galley-link.btn.obj_galley_link.pdf")
+    return pdf_link.get("href") if pdf_link else None
+
+def find_pdf_link_lxml(tree):
+    pdf_link = X_PDF_LINK(tree)
+    return pdf_link[0].get("href") if pdf_link else None
+
+def find_supplementary_links(soup):
+    return [href for href in (link.get("href", "") for link in soup.select("a[href]"))
+            if href.endswith(".xml") or href.endswith(".html")]
+
+def find_supplementary_links_lxml(tree):
+    return [href for href in X_HREFS(tree) if href.endswith(".xml") or href.endswith(".html")]
+
+def parse_lxml(data):
+    return lxml.html.document_fromstring(data, parser=LXML_HTML_PARSER)
+
+def render_lxml(tree):
+    return lxml.html.tostring(tree, pretty_print=True, encoding="unicode")
+
+
+StreamPage = namedtuple("StreamPage", "tree doi pdf_href hrefs")
+
+def stream_keeps(elem):
+    if elem.tag == "meta":
+        return elem.get("name") == "DC.Date"
+    return any((elem.tag, cls) in STREAM_KEEP for cls in elem.get("class", "").split())
+
+def pull_events(parser, data):
+    for offset in range(0, len(data), STREAM_CHUNK_SIZE):
+        parser.feed(data[offset:offset + STREAM_CHUNK_SIZE])
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+def append_stripped(out, text):
+    text = text.strip()
+    if text:
+        if out.tell():
+            out.write(" ")
+        out.write(text)
+
+def parse_stream(data):
+    parser = etree.HTMLPullParser(events=("start", "end"), encoding="utf-8", remove_comments=True)
+    kept = set()
+    keep_depth = skip_depth = 0
+    references = None
+    in_references = False
+    entry = io.StringIO()
+    dois, pdf_links, hrefs = [], [], []
+    elem = None
+
+    for event, elem in pull_events(parser, data):
+        if event == "start":
+            if in_references:
+                parent = elem.getparent()
+                if parent is not references:
+                    previous = elem.getprevious()
+                    text = previous.tail if previous is not None else parent.text
+                    if text and not skip_depth:
+                        append_stripped(entry, text)
+                    if previous is not None:
+                        parent.remove(previous)
+                if elem.tag in TEXT_SKIP_TAGS:
+                    skip_depth += 1
+            if keep_depth or stream_keeps(elem):
+                keep_depth += 1
+                if references is None and "article-references-content" in elem.get("class", "").split():
+                    references = elem
+                    in_references = True
+            continue
+
+        if elem.tag == "a":
+            href = elem.get("href")
+            classes = set(elem.get("class", "").split())
+            if not pdf_links and PDF_LINK_CLASSES <= classes:
+                pdf_links.append(href)
+            if href and not dois and "doi.org" in href:
+                dois.append(node_text(elem).strip())
+            if href and (href.endswith(".xml") or href.endswith(".html")):
+                hrefs.append(href)
+
+        if in_references:
+            if elem is references:
+                in_references = False
+            else:
+                text = elem[-1].tail if len(elem) else elem.text
+                if text and not skip_depth:
+                    append_stripped(entry, text)
+                if elem.tag in TEXT_SKIP_TAGS:
+                    skip_depth -= 1
+                elem.clear(keep_tail=True)
+                if elem.getparent() is references:
+                    elem.text = entry.getvalue()
+                    entry = io.StringIO()
+
+        if keep_depth:
+            keep_depth -= 1
+            if not keep_depth:
+                kept.add(elem)
+        elif any(child in kept for child in elem):
+            kept.add(elem)
+            for child in list(elem):
+                if child not in kept:
+                    elem.remove(child)
+        else:
+            elem.clear()
+
+    tree = elem.getroottree().getroot() if elem is not None else parse_lxml(b"<html></html>")
+    return StreamPage(tree, dois[0] if dois else "", pdf_links[0] if pdf_links else None, hrefs)
+
+def extract_metadata_stream(page, article_id):
+    metadata = extract_metadata_lxml(page.tree, article_id)
+    if metadata:
+        metadata["doi"] = page.doi
+    return metadata
+
+
+ParserBackend = namedtuple("ParserBackend",
+                           "parse extract_metadata find_pdf_link find_supplementary_links render release")
+
+PARSER_BACKENDS = {
+    "bs4": ParserBackend(
+        lambda data: BeautifulSoup(data, 'lxml'), extract_metadata,
+        find_pdf_link, find_supplementary_links, lambda soup: soup.prettify(), lambda soup: soup.decompose(),
+    ),
+    "lxml": ParserBackend(
+        parse_lxml, extract_metadata_lxml,
+        find_pdf_link_lxml, find_supplementary_links_lxml, render_lxml, lambda tree: None,
+    ),
+    "stream": ParserBackend(
+        parse_stream, extract_metadata_stream,
+        lambda page: page.pdf_href, lambda page: page.hrefs, lambda page: render_lxml(page.tree),
+        lambda page: None,
+    ),
+}
+
+
+def fetch_article(article_url, article_id, backend=PARSER_BACKEND):
+    parser = PARSER_BACKENDS[backend]
+    page = fetch_page(article_url, year_filter=True, parse=parser.parse)
+    if not page or page["soup"] is None:
+        return page, None
+    with telemetry.stage("extract"):
+        started = time.perf_counter()
+        metadata = parser.extract_metadata(page["soup"], article_id)
+        page["parse_time"] += time.perf_counter() - started
+    return page, metadata
+
+
+def normalized(value):
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple)):
+        return [normalized(item) for item in value]
+    return value
+
+
+def fingerprint(metadata, pdf_href, supplementary):
+    fields = {name: normalized(metadata.get(name, "")) for name in FINGERPRINT_FIELDS}
+    fields["files"] = [pdf_href] + list(supplementary)
+    return hashlib.sha256(json.dumps(fields, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def parse_article(data, article_id, backend=PARSER_BACKEND, render=False):
+    parser = PARSER_BACKENDS[backend]
+    started = time.perf_counter()
+    tree = parser.parse(data)
+    parsed = time.perf_counter()
+    metadata = parser.extract_metadata(tree, article_id)
+    record = None
+    if metadata:
+        record = {
+            "metadata": metadata,
+            "pdf_href": parser.find_pdf_link(tree),
+            "supplementary": parser.find_supplementary_links(tree),
+            "rendered": parser.render(tree) if render else None,
+        }
+        record["fingerprint"] = fingerprint(metadata, record["pdf_href"], record["supplementary"])
+    parser.release(tree)
+    return record, {"parse": parsed - started, "extract": time.perf_counter() - parsed}
+
+
+def staged(ctx, article_id, stage, fn):
+    return functools.partial(telemetry.call, stage, ctx["profiler"].wrap(article_id, stage, fn))
+
+
+async def write_xml(ctx, article_id, metadata, files_info, article_folder):
+    with telemetry.track("xml"):
+        _, elapsed = await asyncio.get_running_loop().run_in_executor(
+            ctx["parse_pool"], metrics.timed, ctx["profiler"].wrap(article_id, "xml", generate_xml),
+            metadata, files_info, article_folder, ctx["validate_xml"],
+        )
+    telemetry.observe("xml", elapsed)
+
+
+def unchanged(ctx, stats, article_id, content_hash):
+    print(f"[{article_id}] Unchanged since the last run")
+    ctx["journal"].record(article_id, crawl_journal.DONE, content_hash)
+    ctx["changes"]["unchanged"].append(article_id)
+    stats["unchanged"] += 1
+
+
+def pdf_failed(ctx, stats, article_id, href):
+    print(f"[{article_id}] PDF download failed, the next resumed run retries it")
+    ctx["journal"].dead_letter(article_id, f"PDF download failed: {href}")
+    stats["failed"] += 1
+
+
+def link_entities(ctx, article_id, metadata):
+    references = metadata.pop("reference_list", None) or []
+    if ctx["entities"]:
+        metadata["authors"], metadata["reference_keys"] = telemetry.call(
+            "entities", ctx["entities"].add_article, article_id, metadata["authors"], references
+        )
+        if ctx["reference_keys_only"]:
+            metadata.pop("references", None)
+
+
+async def crawl_article(article_id, ctx, stats):
+    article_url = ctx["url_template"].format(article_id)
+    loop = asyncio.get_running_loop()
+    archive = ctx["archive"]
+
+    journal = ctx["journal"]
+    profiler = ctx["profiler"]
+    known = ctx["known"].get(article_id)
+
+    async with ctx["parse_slots"]:
+        async with ctx["page_sem"]:
+            print(f"\n Checking Article ID: {article_id}")
+            ctx["article_started"][article_id] = time.perf_counter()
+            stats["checked"] += 1
+            profiler.sample(article_id)
+            journal.record(article_id, crawl_journal.PENDING)
+            page, page_requests = await asyncio.to_thread(
+                counted, profiler.wrap(article_id, "fetch", fetch_page), article_url, True, None, True
+            )
+        ctx["pages"][article_id] = page
+        record = None
+        content_hash = hashlib.sha256(page["data"]).hexdigest() if page and page["data"] is not None else None
+        if ctx["incremental"] and known and content_hash == known[0]:
+            release_page(page)
+            stats["requests"] += page_requests
+            return unchanged(ctx, stats, article_id, content_hash)
+        if content_hash:
+            with telemetry.track("parse"):
+                record, timings = await loop.run_in_executor(
+                    ctx["parse_pool"], profiler.wrap(article_id, "parse", parse_article), page["data"], article_id,
+                    ctx["parser"], bool(archive and archive.mode == "html"),
+                )
+            for stage, elapsed in timings.items():
+                telemetry.observe(stage, elapsed)
+            page["parse_time"] = sum(timings.values())
+        if not archive or not record:
+            release_page(page, record_size(record))
+    stats["requests"] += page_requests
+    metadata = record["metadata"] if record else None
     if not metadata:
-        print("Skipped (no data or not 2024/2025)")
-        continue
+        if not page or page.get("error") or (page["status"] != 200 and page["status"] != 404):
+            print(f"[{article_id}] Failed to load page")
+            journal.dead_letter(article_id, (page.get("error") or f"HTTP {page['status']}") if page else "fetch error")
+            stats["failed"] += 1
+            return
+        if known:
+            print(f"[{article_id}] Withdrawn since the last run")
+            ctx["changes"]["withdrawn"].append(article_id)
+        if page["status"] == 404:
+            print(f"[{article_id}] Skipped (not found)")
+            journal.record(article_id, crawl_journal.NOT_FOUND)
+        elif page.get("year_rejected"):
+            print(f"[{article_id}] Skipped by year pre-filter")
+            journal.record(article_id, crawl_journal.SKIPPED_BY_YEAR)
+            stats["prefiltered"] += 1
+        else:
+            print(f"[{article_id}] Skipped (no data or not 2024/2025)")
+            journal.record(article_id, crawl_journal.SKIPPED_BY_YEAR)
+        stats["skipped"] += 1
+        return
+    if ctx["incremental"] and known and record["fingerprint"] == known[1]:
+        release_page(page)
+        return unchanged(ctx, stats, article_id, content_hash)
+
+    print(f"[{article_id}] {metadata['year']} | {metadata['title']}")
+    article_folder = create_article_folder(metadata["year"], metadata["journal"], metadata["title"], article_id, ctx["root"])
+    requests_issued = page_requests
 
-    print(f"{metadata['year']} | {metadata['title']}")
-    article_folder = create_article_folder(metadata["year"], metadata["journal"], metadata["title"], article_id)
+    if archive:
+        await asyncio.to_thread(staged(ctx, article_id, "archive", archive.save), article_id, article_url,
+                                page["data"], article_folder, lambda: record["rendered"])
+        release_page(page, record_size(record))
+        record["rendered"] = None
 
     files_info = {"pdf_name": "", "pdf_size": 0}
-    article_page = get_soup(article_url) #Intended
-    if not article_page: #Intended
-        continue #Intended
-
-
-    with open(os.path.join(article_folder, "page.html"), "w", encoding="utf-8") as f:
-        f.write(article_page.prettify())
-        
-    pdf_link = article_page.select_one("a.galley-link.btn.obj_galley_link.pdf")
-    if pdf_link:
-        href = pdf_link.get("href")
-        name, size = download_file(href, article_url, article_folder)
-        files_info["pdf_name"] = name if name else ""
+    href = record["pdf_href"]
+    if href:
+        async with ctx["pdf_sem"]:
+            (name, size, _), n = await asyncio.to_thread(
+                counted, staged(ctx, article_id, "download", download_file), href, article_url, article_folder
+            )
+        requests_issued += n
+        if not name:
+            stats["requests"] += requests_issued - page_requests
+            return pdf_failed(ctx, stats, article_id, href)
+        files_info["pdf_name"] = name
         files_info["pdf_size"] = size
+
+    for href in record["supplementary"]:
+        async with ctx["pdf_sem"]:
+            _, n = await asyncio.to_thread(
+                counted, staged(ctx, article_id, "download", download_file), href, article_url, article_folder, False
+            )
+        requests_issued += n
+
+    stats["requests"] += requests_issued - page_requests
+    print(f"[{article_id}] requests: {requests_issued} ({page_requests} page) | parse: {page['parse_time'] * 1000:.1f} ms")
+    link_entities(ctx, article_id, metadata)
+    await write_xml(ctx, article_id, metadata, files_info, article_folder)
+    if ctx["catalog"]:
+        ctx["catalog"].add(metadata, files_info["pdf_name"], files_info["pdf_size"], article_folder)
+    journal.record(article_id, crawl_journal.DONE, content_hash, files_info["pdf_size"], record["fingerprint"])
+    ctx["changes"]["updated" if known else "new"].append(article_id)
+    stats["saved"] += 1
+
+
+async def harvest_record(article_id, ctx, stats, metadata, galleys):
+    journal = ctx["journal"]
+    ctx["article_started"][article_id] = time.perf_counter()
+    stats["checked"] += 1
+    if not metadata:
+        print(f"[{article_id}] Skipped (not 2024/2025)")
+        journal.record(article_id, crawl_journal.SKIPPED_BY_YEAR)
+        stats["skipped"] += 1
+        return
+
+    print(f"[{article_id}] {metadata['year']} | {metadata['title']}")
+    ctx["profiler"].sample(article_id)
+    journal.record(article_id, crawl_journal.PENDING)
+    article_url = ctx["url_template"].format(article_id)
+    article_folder = create_article_folder(metadata["year"], metadata["journal"], metadata["title"], article_id, ctx["root"])
+
+    files_info = {"pdf_name": "", "pdf_size": 0}
+    requests_issued = 0
+    for position, href in enumerate(galleys):
+        async with ctx["pdf_sem"]:
+            (name, size, _), n = await asyncio.to_thread(
+                counted, staged(ctx, article_id, "download", download_file), href, article_url, article_folder,
+                True, position == 0
+            )
+        requests_issued += n
+        if name:
+            files_info["pdf_name"] = name
+            files_info["pdf_size"] = size
+            break
+
+    stats["requests"] += requests_issued
+    if galleys and not files_info["pdf_name"]:
+        return pdf_failed(ctx, stats, article_id, galleys[0])
+    print(f"[{article_id}] requests: {requests_issued} (0 page)")
+    link_entities(ctx, article_id, metadata)
+    await write_xml(ctx, article_id, metadata, files_info, article_folder)
+    if ctx["catalog"]:
+        ctx["catalog"].add(metadata, files_info["pdf_name"], files_info["pdf_size"], article_folder)
+    journal.record(article_id, crawl_journal.DONE, pdf_size=files_info["pdf_size"])
+    stats["saved"] += 1
+
+
+async def crawl_article_safe(article_id, ctx, stats, step=crawl_article, *step_args):
+    try:
+        with telemetry.track("article"):
+            await step(article_id, ctx, stats, *step_args)
+    except Exception as e:
+        print(f"[ERROR] Article {article_id} failed: {e}")
+        ctx["journal"].dead_letter(article_id, str(e) or type(e).__name__)
+        stats["failed"] += 1
+    finally:
+        release_page(ctx["pages"].pop(article_id, None))
+        started = ctx["article_started"].pop(article_id, None)
+        if started is not None:
+            telemetry.observe("article", time.perf_counter() - started)
+
+
+def open_crawl(url_template, root, page_concurrency, pdf_concurrency, host_rate, parser, cache_max_bytes, dedup,
+               validate_xml, export_catalog, archive_mode, archive_codec, parse_workers,
+               metrics_port=None, metrics_interval=0.0, profile_every=0, incremental=False,
+               page_bytes=MAX_PAGE_BYTES, buffered_bytes=MAX_BUFFERED_BYTES, entities=True,
+               reference_keys_only=False):
+    global http, cache, blobs, scheduler, telemetry, page_budget, max_page_bytes
+    os.makedirs(root, exist_ok=True)
+    page_budget = ByteBudget(buffered_bytes) if buffered_bytes else None
+    max_page_bytes = page_bytes
+    if page_budget:
+        pin_mmap_threshold()
+    cache = http_cache.HTTPCache(root, cache_max_bytes) if cache_max_bytes else None
+    blobs = blob_store.BlobStore(root) if dedup else None
+    telemetry = metrics.Metrics()
+    http = urllib3.PoolManager(maxsize=page_concurrency + pdf_concurrency, block=True)
+    scheduler = host_scheduler.HostScheduler(host_rate, page_concurrency + pdf_concurrency)
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=page_concurrency + pdf_concurrency))
+
+    journal = crawl_journal.CrawlJournal(root)
+    ctx = {
+        "url_template": url_template,
+        "root": root,
+        "parser": parser,
+        "page_sem": asyncio.Semaphore(page_concurrency),
+        "pdf_sem": asyncio.Semaphore(pdf_concurrency),
+        "journal": journal,
+        "incremental": incremental,
+        "known": journal.fingerprints(),
+        "changes": {kind: [] for kind in CHANGE_KINDS},
+        "parse_pool": ProcessPoolExecutor(parse_workers, multiprocessing.get_context("spawn"))
+                      if parse_workers else None,
+        "parse_slots": asyncio.Semaphore(page_concurrency + PARSE_BACKLOG * max(parse_workers, 1)),
+        "validate_xml": validate_xml,
+        "catalog": catalog.CatalogSink(root) if export_catalog else None,
+        "entities": entity_store.EntityStore(root) if entities else None,
+        "reference_keys_only": reference_keys_only,
+        "archive": page_archive.PageArchive(root, archive_mode, archive_codec) if archive_mode != "off" else None,
+        "profiler": metrics.Profiler(root, profile_every),
+        "article_started": {},
+        "pages": {},
+        "started": time.monotonic(),
+    }
+    stats = dict.fromkeys(RUN_COUNTERS, 0)
+    telemetry.add_source(lambda: {f"articles_{name}": stats[name] for name in RUN_COUNTERS})
+    telemetry.add_source(lambda: {"retries": scheduler.retries, "throttled": scheduler.throttled,
+                                  "connection_errors": scheduler.errors, "peak_rss_bytes": metrics.peak_rss()})
+    if page_budget:
+        telemetry.add_source(lambda: {"buffered_bytes": page_budget.used, "buffered_peak_bytes": page_budget.peak})
+    ctx["exporter"] = metrics.MetricsExporter(telemetry, metrics_port, os.path.join(root, metrics.SNAPSHOT_FILENAME),
+                                              metrics_interval)
+    return ctx, stats
+
+def close_crawl(ctx, stats):
+    global cache, blobs
+    stats["dead_letters"] = ctx["journal"].dead_letters()
+    stats["journal"] = ctx["journal"].counts()
+    if ctx["incremental"]:
+        stats["changes"] = {kind: len(ids) for kind, ids in ctx["changes"].items()}
+        stats["change_report"] = write_change_report(ctx["root"], ctx["changes"])
+    ctx["journal"].close()
+    if ctx["parse_pool"]:
+        ctx["parse_pool"].shutdown()
+    if ctx["catalog"]:
+        stats["catalog"] = ctx["catalog"].close()
+    if ctx["entities"]:
+        stats["entities"] = ctx["entities"].summary()
+        if ctx["catalog"]:
+            ctx["entities"].export_parquet()
+        ctx["entities"].close()
+    if ctx["archive"]:
+        stats["archive"] = ctx["archive"].close()
+    if cache:
+        stats["cache_hits"], stats["cache_misses"] = cache.hits, cache.misses
+        cache.close()
+        cache = None
+    if blobs:
+        stats["blobs"] = blobs.summary()
+        blobs = None
+    stats["downloaded_bytes"] = telemetry.value("bytes_received_total")
+    stats["scheduler"] = scheduler.summary()
+    if page_budget:
+        stats["buffered"] = page_budget.summary()
+    stats["statuses"] = {dict(labels)["status"]: n for (name, labels), n in telemetry.counters.items()
+                         if name == "http_responses_total"}
+    stats["stages"] = telemetry.summary()
+    profile = ctx["profiler"].close()
+    if profile:
+        stats["profile"] = profile
+    stats["elapsed"] = time.monotonic() - ctx["started"]
+    stats["rate"] = stats["checked"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    ctx["exporter"].close()
+
+
+async def crawl(article_ids, url_template=ARTICLE_URL_TEMPLATE, root=ROOT_FOLDER,
+                page_concurrency=PAGE_CONCURRENCY, pdf_concurrency=PDF_CONCURRENCY, host_rate=HOST_RATE_LIMIT,
+                parser=PARSER_BACKEND, resume=True, cache_max_bytes=HTTP_CACHE_MAX_BYTES, dedup=True,
+                validate_xml=False, export_catalog=True, archive_mode=ARCHIVE_MODE, archive_codec=ARCHIVE_CODEC,
+                parse_workers=PARSE_WORKERS, metrics_port=None, metrics_interval=0.0, profile_every=0,
+                incremental=False, page_bytes=MAX_PAGE_BYTES, buffered_bytes=MAX_BUFFERED_BYTES, entities=True,
+                reference_keys_only=False, end=None):
+    ctx, stats = open_crawl(url_template, root, page_concurrency, pdf_concurrency, host_rate, parser,
+                            cache_max_bytes, dedup, validate_xml, export_catalog, archive_mode, archive_codec,
+                            parse_workers, metrics_port, metrics_interval, profile_every, incremental,
+                            page_bytes, buffered_bytes, entities, reference_keys_only)
+    try:
+        if incremental:
+            article_ids = await probe_new(ctx, stats, article_ids, end)
+        await crawl_batch(ctx, stats, article_ids, resume and not incremental)
+    finally:
+        close_crawl(ctx, stats)
+    return stats
+
+
+async def probe_new(ctx, stats, article_ids, end=None):
+    article_ids = list(article_ids)
+    last_known = max(ctx["known"], default=None)
+    if last_known is None:
+        return article_ids
+
+    journal = ctx["journal"]
+    out_of_year = journal.ids_with_status(crawl_journal.SKIPPED_BY_YEAR)
+    article_ids = [article_id for article_id in article_ids if article_id not in out_of_year]
+    newer = [article_id for article_id in article_ids if article_id > last_known]
+    await crawl_batch(ctx, stats, newer, resume=False)
+    first = start = max(article_ids + [last_known]) + 1
+    if end is not None:
+        print(f"Incremental: explicit range up to {end}, not probing past it")
     else:
-        files_info["pdf_name"] = ""
-        files_info["pdf_size"] = 0
+        for _ in range(MAX_PROBE_WINDOWS):
+            window = list(range(start, start + PROBE_WINDOW))
+            await crawl_batch(ctx, stats, window, resume=False)
+            start += PROBE_WINDOW
+            if crawl_journal.DONE not in journal.statuses(window).values():
+                break
+        else:
+            print(f"[WARN] Stopped probing after {MAX_PROBE_WINDOWS} windows of new articles above {last_known}")
+    print(f"Incremental: {len(ctx['known'])} known articles, probed {len(newer) + start - first} IDs above "
+          f"{last_known} first")
+    return [article_id for article_id in article_ids if article_id <= last_known]
+
+
+def write_change_report(root, changes):
+    path = os.path.join(root, "changes", f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({kind: sorted(ids) for kind, ids in changes.items()}, f, indent=2)
+    return path
+
+
+async def crawl_batch(ctx, stats, article_ids, resume=True):
+    article_ids = list(article_ids)
+    if resume:
+        pending_ids = ctx["journal"].pending(article_ids)
+        print(f"Resuming: {len(article_ids) - len(pending_ids)} IDs already finished, {len(pending_ids)} to crawl")
+        article_ids = pending_ids
+    await asyncio.gather(*(crawl_article_safe(article_id, ctx, stats) for article_id in article_ids))
+
 
-    for link in article_page.select("a[href]"):
-        href = link.get("href", "")
-        if href.endswith(".xml") or href.endswith(".html"):
-            download_file(href, article_url, article_folder)
+async def keep_lease(queue, worker_id, lease_id, ttl):
+    while True:
+        await asyncio.sleep(ttl / 3)
+        if not queue.heartbeat(worker_id, lease_id, ttl):
+            print(f"[WARN] Lost lease {lease_id}, another worker may crawl it again")
+            return
+
+
+async def work(queue_path, worker_id=None, url_template=ARTICLE_URL_TEMPLATE, root=ROOT_FOLDER,
+               page_concurrency=PAGE_CONCURRENCY, pdf_concurrency=PDF_CONCURRENCY, host_rate=HOST_RATE_LIMIT,
+               parser=PARSER_BACKEND, resume=True, cache_max_bytes=HTTP_CACHE_MAX_BYTES, dedup=True,
+               validate_xml=False, export_catalog=True, archive_mode=ARCHIVE_MODE, archive_codec=ARCHIVE_CODEC,
+               parse_workers=PARSE_WORKERS, metrics_port=None, metrics_interval=0.0, profile_every=0,
+               lease_ttl=work_queue.LEASE_TTL, page_bytes=MAX_PAGE_BYTES, buffered_bytes=MAX_BUFFERED_BYTES,
+               entities=True, reference_keys_only=False):
+    queue = work_queue.WorkQueue(queue_path)
+    worker_id = worker_id or work_queue.default_worker_id()
+    queue.register(worker_id, root)
+    ctx, stats = open_crawl(url_template, root, page_concurrency, pdf_concurrency, host_rate, parser,
+                            cache_max_bytes, dedup, validate_xml, export_catalog, archive_mode, archive_codec,
+                            parse_workers, metrics_port, metrics_interval, profile_every, False,
+                            page_bytes, buffered_bytes, entities, reference_keys_only)
+    stats["leases"] = 0
+
+    try:
+        while True:
+            lease = queue.claim(worker_id, lease_ttl)
+            if lease is None:
+                if not queue.unfinished():
+                    break
+                next_expiry = queue.next_expiry() or time.time()
+                await asyncio.sleep(min(lease_ttl / 4, max(1.0, next_expiry - time.time())))
+                continue
+
+            lease_id, article_ids = lease
+            print(f"[{worker_id}] Lease {lease_id}: {len(article_ids)} IDs")
+            heartbeat = asyncio.create_task(keep_lease(queue, worker_id, lease_id, lease_ttl))
+            checked = stats["checked"]
+            try:
+                await crawl_batch(ctx, stats, article_ids, resume)
+            except BaseException:
+                queue.release(worker_id, lease_id)
+                raise
+            finally:
+                heartbeat.cancel()
+            if not queue.complete(worker_id, lease_id, stats["checked"] - checked):
+                print(f"[WARN] Lease {lease_id} expired before it was finished, another worker may repeat it")
+            stats["leases"] += 1
+    finally:
+        close_crawl(ctx, stats)
+        queue.close()
+    return stats
+
+
+def link_or_copy(source, target):
+    if os.path.exists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def merge_roots(roots, root):
+    os.makedirs(root, exist_ok=True)
+    sink = catalog.CatalogSink(root)
+    files = 0
+    with open(sink.jsonl_path, "wb") as merged_catalog:
+        for source in roots:
+            if not os.path.isdir(source):
+                print(f"[WARN] Worker root {source} not found, skipping it")
+                continue
+            if os.path.abspath(source) == os.path.abspath(root):
+                print(f"[WARN] Worker root {source} is the merge target, skipping it")
+                continue
+            tops = [name for name in os.listdir(source)
+                    if YEAR_DIR_RE.match(name) or name == page_archive.ARCHIVE_DIRNAME]
+            for top in tops:
+                for folder, _, names in os.walk(os.path.join(source, top)):
+                    target = os.path.join(root, os.path.relpath(folder, source))
+                    os.makedirs(target, exist_ok=True)
+                    for name in names:
+                        link_or_copy(os.path.realpath(os.path.join(folder, name)), os.path.join(target, name))
+                        files += 1
+            catalog_path = os.path.join(source, catalog.JSONL_FILENAME)
+            if os.path.exists(catalog_path):
+                with open(catalog_path, "rb") as f:
+                    shutil.copyfileobj(f, merged_catalog)
+    rows = sink.write_parquet()
+    entity_roots = [source for source in roots if os.path.abspath(source) != os.path.abspath(root)
+                    and os.path.exists(os.path.join(source, entity_store.ENTITIES_FILENAME))]
+    if entity_roots:
+        entities = entity_store.EntityStore(root)
+        for source in entity_roots:
+            entities.merge(os.path.join(source, entity_store.ENTITIES_FILENAME))
+        entities.export_parquet()
+        summary = entities.summary()
+        entities.close()
+    return f"{files} files from {len(roots)} worker roots into {root}" + (
+        f", {rows} rows in {catalog.PARQUET_FILENAME}" if rows else ""
+    ) + (f", entities: {summary}" if entity_roots else "")
+
+
+async def harvest(oai_url, url_template=ARTICLE_URL_TEMPLATE, root=ROOT_FOLDER, pdf_concurrency=PDF_CONCURRENCY,
+                  host_rate=HOST_RATE_LIMIT, resume=True, cache_max_bytes=HTTP_CACHE_MAX_BYTES, dedup=True,
+                  from_date=None, validate_xml=False, export_catalog=True, metrics_port=None, metrics_interval=0.0,
+                  profile_every=0, entities=True):
+    ctx, stats = open_crawl(url_template, root, 1, pdf_concurrency, host_rate, PARSER_BACKEND,
+                            cache_max_bytes, dedup, validate_xml, export_catalog, "off", None, 0,
+                            metrics_port, metrics_interval, profile_every, entities=entities)
+    finished = ctx["journal"].finished_ids() if resume else set()
+    stats["oai_pages"] = 0
+    tasks = set()
+
+    try:
+        url = oai_harvest.list_records_url(oai_url, from_date)
+        while url:
+            try:
+                (records, token), n = await asyncio.to_thread(counted, fetch_oai_records, url)
+            except (discovery.DiscoveryError, etree.XMLSyntaxError) as e:
+                print(f"[ERROR] OAI harvest stopped at {url}: {e}")
+                stats["failed"] += 1
+                break
+            stats["requests"] += n
+            stats["oai_pages"] += 1
+            for article_id, metadata, galleys in records:
+                if article_id in finished:
+                    continue
+                if len(tasks) >= pdf_concurrency * HARVEST_BACKLOG:
+                    _, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                tasks.add(asyncio.create_task(
+                    crawl_article_safe(article_id, ctx, stats, harvest_record, metadata, galleys)
+                ))
+            url = oai_harvest.list_records_url(oai_url, token=token) if token else None
+        if tasks:
+            await asyncio.wait(tasks)
+    finally:
+        close_crawl(ctx, stats)
+    return stats
+
+
+def use_browser_session(headless=True, challenge_cookie=None):
+    global session_solver
+    import sol_new_proof
+
+    session_solver = lambda: sol_new_proof.export_session(headless, challenge_cookie)
+    refresh_session(session["generation"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl OJS article pages by ID.")
+    parser.add_argument("--start", type=int,
+                        help=f"first article ID (default {START_ID}); also limits discovered IDs when given")
+    parser.add_argument("--end", type=int,
+                        help=f"last article ID (default {END_ID}); also limits discovered IDs when given")
+    parser.add_argument("--root", default=ROOT_FOLDER)
+    parser.add_argument("--url-template", default=ARTICLE_URL_TEMPLATE)
+    parser.add_argument("--page-concurrency", type=int, default=PAGE_CONCURRENCY)
+    parser.add_argument("--pdf-concurrency", type=int, default=PDF_CONCURRENCY)
+    parser.add_argument("--host-rate", type=float, default=HOST_RATE_LIMIT,
+                        help="max requests per second per host (0 disables)")
+    parser.add_argument("--discover", choices=["auto", "oai", "archive", "range"], default=DISCOVERY_METHOD,
+                        help="find article IDs via OAI-PMH, the issue archive, or by scanning --start..--end")
+    parser.add_argument("--coordinator", metavar="QUEUE",
+                        help="split the discovered IDs into leases in this SQLite work queue and exit")
+    parser.add_argument("--worker", metavar="QUEUE", help="claim leases from this work queue until it is drained")
+    parser.add_argument("--worker-id", help="name of this worker in the queue (default host-pid)")
+    parser.add_argument("--lease-size", type=int, default=work_queue.LEASE_SIZE, help="article IDs per lease")
+    parser.add_argument("--lease-ttl", type=float, default=work_queue.LEASE_TTL,
+                        help="seconds without a heartbeat before a worker's lease is handed to another worker")
+    parser.add_argument("--merge", metavar="QUEUE",
+                        help="merge the output roots of the queue's workers into --root and exit")
+    parser.add_argument("--harvest", action="store_true",
+                        help="take metadata from OAI-PMH ListRecords instead of scraping article pages")
+    parser.add_argument("--incremental", action="store_true",
+                        help="revisit finished articles but only rewrite those whose metadata fingerprint changed, "
+                             "probe IDs past the last known one first and write a change report")
+    parser.add_argument("--no-resume", dest="resume", action="store_false",
+                        help="ignore the crawl journal and re-crawl IDs that already finished")
+    parser.add_argument("--cache-size-mb", type=int, default=HTTP_CACHE_MAX_BYTES // 1024 ** 2,
+                        help="disk budget for the conditional-request HTTP cache (0 disables it)")
+    parser.add_argument("--no-dedup", dest="dedup", action="store_false",
+                        help="write each download into its article folder instead of the shared blob store")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS,
+                        help="parse pages and write XML in this many worker processes (0 parses in threads)")
+    parser.add_argument("--parser", choices=sorted(PARSER_BACKENDS), default=PARSER_BACKEND,
+                        help="HTML parser backend used for metadata extraction")
+    parser.add_argument("--validate-xml", action="store_true",
+                        help="re-read every metadata.xml and check it against the article schema")
+    parser.add_argument("--no-catalog", dest="catalog", action="store_false",
+                        help="skip the catalog.jsonl/catalog.parquet export")
+    parser.add_argument("--no-entities", dest="entities", action="store_false",
+                        help="skip the shared author/affiliation/reference index in <root>/entities.sqlite3")
+    parser.add_argument("--reference-keys-only", action="store_true",
+                        help="write only the entity keys, not the <References> text, to metadata.xml and the catalog")
+    parser.add_argument("--articles-by-orcid", metavar="ORCID",
+                        help="print the IDs of the crawled articles by this author from the entity index and exit")
+    parser.add_argument("--articles-citing", metavar="DOI",
+                        help="print the IDs of the crawled articles that cite this DOI from the entity index and exit")
+    parser.add_argument("--archive", choices=page_archive.ARCHIVE_MODES, default=ARCHIVE_MODE,
+                        help="keep the received page bytes compressed per article (file), in per-run tar or WARC "
+                             "shards, as the old prettified page.html (html), or not at all (off)")
+    parser.add_argument("--archive-codec", choices=page_archive.ARCHIVE_CODECS, default=ARCHIVE_CODEC,
+                        help="compression for --archive file/tar (zstd needs the zstandard package)")
+    parser.add_argument("--max-page-mb", type=float, default=MAX_PAGE_BYTES / 1024 ** 2,
+                        help="fail article pages whose body is larger than this")
+    parser.add_argument("--max-buffered-mb", type=float, default=MAX_BUFFERED_BYTES / 1024 ** 2,
+                        help="cap on page bytes held in memory across all in-flight articles; fetches wait for "
+                             "room once it is reached (0 disables the cap)")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve Prometheus metrics on this local port while the crawl runs")
+    parser.add_argument("--metrics-interval", type=float, default=0.0,
+                        help="also rewrite <root>/metrics.json every this many seconds (it is always written at the end)")
+    parser.add_argument("--profile-every", type=int, default=0, metavar="N",
+                        help="cProfile every Nth article and write the profiles to <root>/profiles")
+    parser.add_argument("--hybrid", action="store_true",
+                        help="solve the JS challenge in Playwright and reuse its cookies for urllib3 requests")
+    parser.add_argument("--challenge-cookie", help="cookie name that marks the JS challenge as solved (--hybrid)")
+    parser.add_argument("--headed", action="store_true", help="show the challenge-solving browser (--hybrid)")
+    args = parser.parse_args(argv)
+
+    if args.merge:
+        queue = work_queue.WorkQueue(args.merge)
+        roots = [worker_root for _, worker_root, _, _ in queue.workers()]
+        unfinished = queue.unfinished()
+        queue.close()
+        if unfinished:
+            print(f"[WARN] {unfinished} leases are not done yet, merging what is there")
+        print(f"Merged {merge_roots(roots, args.root)}")
+        return None
+
+    if args.articles_by_orcid or args.articles_citing:
+        if not os.path.exists(os.path.join(args.root, entity_store.ENTITIES_FILENAME)):
+            print(f"[ERROR] No entity index in {args.root}, crawl with entities enabled first")
+            return None
+        entities = entity_store.EntityStore(args.root)
+        if args.articles_by_orcid:
+            article_ids = entities.articles_by_orcid(args.articles_by_orcid)
+        else:
+            article_ids = entities.articles_citing(args.articles_citing)
+        entities.close()
+        print("\n".join(str(article_id) for article_id in article_ids))
+        return article_ids
+
+    if args.hybrid:
+        use_browser_session(not args.headed, args.challenge_cookie)
+
+    if args.worker:
+        stats = asyncio.run(work(
+            args.worker, args.worker_id, args.url_template, args.root,
+            args.page_concurrency, args.pdf_concurrency, args.host_rate, args.parser, args.resume,
+            args.cache_size_mb * 1024 ** 2, args.dedup, args.validate_xml, args.catalog,
+            args.archive, args.archive_codec, args.parse_workers,
+            args.metrics_port, args.metrics_interval, args.profile_every, args.lease_ttl,
+            int(args.max_page_mb * 1024 ** 2), int(args.max_buffered_mb * 1024 ** 2), args.entities,
+            args.reference_keys_only,
+        ))
+    elif args.harvest:
+        stats = asyncio.run(harvest(
+            discovery.journal_base(args.url_template) + "/oai", args.url_template, args.root,
+            args.pdf_concurrency, args.host_rate, args.resume, args.cache_size_mb * 1024 ** 2, args.dedup,
+            f"{min(TARGET_YEARS)}-01-01", args.validate_xml, args.catalog,
+            args.metrics_port, args.metrics_interval, args.profile_every, args.entities,
+        ))
+    else:
+        start = START_ID if args.start is None else args.start
+        id_range = range(start, (END_ID if args.end is None else args.end) + 1)
+        article_ids = discovery.discover_article_ids(
+            args.discover, args.url_template, fetch_bytes, TARGET_YEARS, id_range
+        )
+        if args.start is not None or args.end is not None:
+            article_ids = [article_id for article_id in article_ids if article_id in id_range]
+            print(f"Keeping {len(article_ids)} discovered IDs in {id_range.start}..{id_range.stop - 1}")
+        if args.coordinator:
+            queue = work_queue.WorkQueue(args.coordinator)
+            if queue.counts():
+                queue.close()
+                print(f"[ERROR] {args.coordinator} already holds leases, use a new queue file for a new job")
+                return None
+            leases = queue.create(article_ids, args.lease_size)
+            queue.close()
+            print(f"Queued {len(article_ids)} IDs in {leases} leases, start workers with --worker {args.coordinator}")
+            return None
+        stats = asyncio.run(crawl(
+            article_ids, args.url_template, args.root,
+            args.page_concurrency, args.pdf_concurrency, args.host_rate, args.parser, args.resume,
+            args.cache_size_mb * 1024 ** 2, args.dedup, args.validate_xml, args.catalog,
+            args.archive, args.archive_codec, args.parse_workers,
+            args.metrics_port, args.metrics_interval, args.profile_every, args.incremental,
+            int(args.max_page_mb * 1024 ** 2), int(args.max_buffered_mb * 1024 ** 2), args.entities,
+            args.reference_keys_only, id_range.stop - 1 if args.start is not None or args.end is not None else None,
+        ))
+    print(f"\n Completed extraction for article IDs: {stats['checked']} checked, {stats['saved']} saved, "
+          f"{stats['skipped']} skipped ({stats['prefiltered']} by year pre-filter), {stats['failed']} failed, "
+          f"{stats['requests']} requests in {stats['elapsed']:.1f}s ({stats['rate']:.2f} articles/s)")
+    print(f" Downloaded {stats['downloaded_bytes'] / 1024 ** 2:.1f} MB")
+    print(" HTTP status: " + ", ".join(f"{status} x{n}" for status, n in sorted(stats["statuses"].items())))
+    print(f" Scheduler: {stats['scheduler']}")
+    if "buffered" in stats:
+        print(f" Page buffer: {stats['buffered']}")
+    print(" Crawl journal: " + ", ".join(f"{n} {status}" for status, n in sorted(stats["journal"].items())))
+    if stats["dead_letters"]:
+        print(f" Dead letters ({len(stats['dead_letters'])} IDs failed after all retries):")
+        for article_id, reason, attempts in stats["dead_letters"]:
+            print(f"   {article_id}: {reason} ({attempts} runs)")
+    if "changes" in stats:
+        print(" Changes: " + ", ".join(f"{stats['changes'][kind]} {kind}" for kind in CHANGE_KINDS)
+              + f" (report in {stats['change_report']})")
+    if "leases" in stats:
+        print(f" Work queue: {stats['leases']} leases finished by this worker")
+    if "oai_pages" in stats:
+        print(f" OAI-PMH: {stats['oai_pages']} ListRecords pages")
+    if "blobs" in stats:
+        print(f" Blob store: {stats['blobs']}")
+    if "archive" in stats:
+        print(f" Page archive: {stats['archive']}")
+    if "catalog" in stats:
+        print(f" Catalog: {stats['catalog']}")
+    if "entities" in stats:
+        print(f" Entities: {stats['entities']}")
+    if "cache_hits" in stats:
+        print(f" HTTP cache: {stats['cache_hits']} hits (304), {stats['cache_misses']} misses")
+    print(" Stage latency (metrics.json has the full snapshot):")
+    for line in stats["stages"]:
+        print(f"   {line}")
+    if "profile" in stats:
+        print(f" Profiles: {stats['profile']}")
+    if args.hybrid:
+        print(f" Browser sessions solved: {session['generation']}")
+    return stats
 
-    generate_xml(metadata, files_info, article_folder)
 
-print("\n Completed extraction for article IDs.")
+if __name__ == "__main__":
+    main()
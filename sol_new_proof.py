@@ -1,93 +1,330 @@
+import argparse
+import asyncio
 import os
 import re
 import shutil
-from playwright.sync_api import sync_playwright
+from contextlib import contextmanager
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from urllib.parse import urljoin, urlparse
 import time
-from lxml import etree
+
+import article_xml
+import metrics
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
 
 BASE_URL = "https://revistas.udca.edu.co"
 ARTICLE_URL = "https://revistas.udca.edu.co/index.php/ruadc/article/view/{}"
 ROOT = "936719013"
 JOURNAL = "Revista U.D.C.A Actualidad & Divulgación Científica"
-article_id = 2373
-
-os.makedirs(ROOT, exist_ok=True)
-folder = os.path.join(ROOT, str(article_id))
-os.makedirs(folder, exist_ok=True)
-
-
-
-def playwright_scrape():
-    max_retries = 3
-
-    for attempt in range(max_retries):
-        print(f" Attempt {attempt + 1}/{max_retries}")
-
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=False,
-                slow_mo=100,
-                args=[
-                    '--no-sandbox',
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                    '--disable-web-security',
-                    '--disable-features=VizDisplayCompositor'
-                ]
-            )
-
-            context = browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                extra_http_headers={
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.9,es;q=0.8',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'none',
-                    'Sec-Fetch-User': '?1',
-                    'Upgrade-Insecure-Requests': '1',
-                },
-            )
-
-            context.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
-                Object.defineProperty(navigator, 'plugins', { get: () => [1,2,3,4,5] });
-                Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
-                window.chrome = { runtime: {} };
-            """)
-
-            page = context.new_page()
-            page.set_extra_http_headers({'Referer': BASE_URL})
-
-            try:
-                print(" Pre-warming base domain...")
-                page.goto(BASE_URL, wait_until='domcontentloaded', timeout=15000)
-                page.wait_for_timeout(2000)
+ARTICLE_IDS = [2373]
+
+POOL_SIZE = 2
+HEADLESS = False
+SLOW_MO = 0
+WAIT_MODE = "ready"
+ARTICLE_BUDGET_MS = 60000
+NETWORK_IDLE_TIMEOUT_MS = 5000
+CHALLENGE_COOKIE = None
+RECYCLE_ATTEMPTS = 2
+telemetry = metrics.Metrics()
+
+ARTICLE_READY_SELECTOR = 'meta[name="DC.Identifier"], meta[name="DC.Title"], meta[name="citation_title"]'
+GALLEY_READY_SELECTOR = 'a.download, a[href$=".pdf"], .download'
+
+LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor'
+]
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+EXTRA_HTTP_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9,es;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Upgrade-Insecure-Requests': '1',
+}
+STEALTH_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
+    Object.defineProperty(navigator, 'plugins', { get: () => [1,2,3,4,5] });
+    Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
+    window.chrome = { runtime: {} };
+"""
+
+
+class ArticleClock:
+    def __init__(self, budget_ms=ARTICLE_BUDGET_MS):
+        self.started = time.monotonic()
+        self.deadline = self.started + budget_ms / 1000
+        self.phases = {}
+
+    def remaining_ms(self):
+        return max(1, int((self.deadline - time.monotonic()) * 1000))
+
+    @contextmanager
+    def phase(self, name):
+        started = time.monotonic()
+        try:
+            with telemetry.track(name):
+                yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+            telemetry.observe(name, elapsed)
 
-                print(f" Loading article...")
-                response = page.goto(
-                    ARTICLE_URL.format(article_id),
-                    wait_until='domcontentloaded',
-                    timeout=45000
-                )
+    def summary(self):
+        parts = [f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases.items()]
+        parts.append(f"total {(time.monotonic() - self.started) * 1000:.0f}ms")
+        return " | ".join(parts)
 
-                if not response or response.status != 200:
-                    raise Exception(f"HTTP {response.status if response else 'No response'}")
 
-                page.wait_for_timeout(5000)
+async def wait_for_ready(page, selector, timeout_ms, network_idle=False):
+    try:
+        await page.wait_for_selector(selector, state='attached', timeout=timeout_ms)
+    except PlaywrightTimeoutError:
+        print(f" [WARN] Readiness signal not seen in {timeout_ms}ms: {selector}")
+        return False
+    if network_idle:
+        try:
+            await page.wait_for_load_state('networkidle', timeout=min(timeout_ms, NETWORK_IDLE_TIMEOUT_MS))
+        except PlaywrightTimeoutError:
+            pass
+    return True
+
+
+async def wait_for_cookie(context, name, timeout_ms):
+    deadline = time.monotonic() + timeout_ms / 1000
+    while time.monotonic() < deadline:
+        if any(cookie["name"] == name for cookie in await context.cookies(BASE_URL)):
+            return True
+        await asyncio.sleep(0.1)
+    print(f" [WARN] Challenge cookie {name} not set after {timeout_ms}ms")
+    return False
+
+
+EXTRACT_SELECTORS = {
+    "title": ['h1.page_title', 'h1.title', '.page_title h1', 'h1', '.article-title', '#articleTitle'],
+    "meta": ["DC.Identifier.DOI", "DC.Date", "DC.Date.issued", "DC.Subject", "DC.Source.Volume", "DC.Source.Issue"],
+    "keywords": ["div.keyword-item a", ".keywords a", "div.keywords a"],
+    "authors": ["div.authors div.author", ".author", "div.author"],
+    "affiliations": ["div.article-author-affilitation", ".affiliation", "div.affiliation"],
+    "galley": ['a.galley-link.obj_galley_link.pdf', 'a[href*=".pdf"]', '.galley-link[href$=".pdf"]', 'a.download'],
+    "max_authors": 10,
+}
+
+EXTRACT_SCRIPT = """
+(sel) => {
+    const firstAll = (selectors) => {
+        for (const s of selectors) {
+            const found = document.querySelectorAll(s);
+            if (found.length) return Array.from(found);
+        }
+        return [];
+    };
+    const text = (el) => (el.innerText || "").trim();
+
+    let title = "";
+    for (const s of sel.title) {
+        const el = document.querySelector(s);
+        if (el) { title = text(el); break; }
+    }
+
+    const meta = {};
+    for (const name of sel.meta) {
+        const el = document.querySelector(`meta[name="${name}"]`);
+        if (el) meta[name] = el.getAttribute("content") || "";
+    }
+
+    const keywordLinks = firstAll(sel.keywords);
+    const affils = firstAll(sel.affiliations);
+    const authors = [];
+    firstAll(sel.authors).slice(0, sel.max_authors).forEach((div, i) => {
+        const strong = div.querySelector("strong, .name, h4");
+        if (!strong) return;
+        const orcid = div.querySelector('a[href*="orcid.org"]');
+        authors.push([
+            text(strong),
+            i < affils.length ? text(affils[i]) : "",
+            orcid ? orcid.getAttribute("href") : "",
+        ]);
+    });
+
+    let galleyHref = "";
+    for (const s of sel.galley) {
+        const el = document.querySelector(s);
+        if (el && el.getAttribute("href")) { galleyHref = el.getAttribute("href"); break; }
+    }
+
+    return {
+        title: title,
+        document_title: document.title,
+        meta: meta,
+        keywords: keywordLinks.map(text),
+        authors: authors,
+        galley_href: galleyHref,
+    };
+}
+"""
+
+
+def article_folder(article_id):
+    folder = os.path.join(ROOT, str(article_id))
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+class BrowserPool:
+    def __init__(self, size=POOL_SIZE, headless=HEADLESS, slow_mo=SLOW_MO, wait_mode=WAIT_MODE,
+                 challenge_cookie=CHALLENGE_COOKIE):
+        self.size = size
+        self.headless = headless
+        self.slow_mo = slow_mo
+        self.wait_mode = wait_mode
+        self.challenge_cookie = challenge_cookie
+        self.live = size
+        self.playwright = None
+        self.browser = None
+        self.idle = asyncio.Queue()
+
+    async def start(self):
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(
+            headless=self.headless,
+            slow_mo=self.slow_mo,
+            args=LAUNCH_ARGS,
+        )
+        contexts = await asyncio.gather(*(self.warm_context() for _ in range(self.size)))
+        for context in contexts:
+            self.idle.put_nowait(context)
+        return self
+
+    async def warm_context(self):
+        context = await self.browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent=USER_AGENT,
+            extra_http_headers=EXTRA_HTTP_HEADERS,
+        )
+        try:
+            await context.add_init_script(STEALTH_SCRIPT)
+
+            page = await context.new_page()
+            await page.set_extra_http_headers({'Referer': BASE_URL})
+            print(" Pre-warming base domain...")
+            started = time.monotonic()
+            await page.goto(BASE_URL, wait_until='domcontentloaded', timeout=15000)
+            if self.wait_mode == "fixed":
+                await page.wait_for_timeout(2000)
+            else:
+                if self.challenge_cookie:
+                    await wait_for_cookie(context, self.challenge_cookie, 15000)
                 try:
-                    page.wait_for_selector('h1, .page_title, title', timeout=10000)
-                except:
+                    await page.wait_for_load_state('networkidle', timeout=NETWORK_IDLE_TIMEOUT_MS)
+                except PlaywrightTimeoutError:
                     pass
+        except Exception:
+            await context.close()
+            raise
+        print(f" Context warmed in {(time.monotonic() - started) * 1000:.0f}ms")
+        return context, page
+
+    async def acquire(self):
+        item = await self.idle.get()
+        if item is None:
+            self.idle.put_nowait(None)
+            raise RuntimeError("no live browser contexts left")
+        return item
+
+    def release(self, context, page):
+        self.idle.put_nowait((context, page))
+
+    async def recycle(self, context):
+        try:
+            await context.close()
+        except Exception:
+            pass
+        for attempt in range(RECYCLE_ATTEMPTS):
+            try:
+                return await self.warm_context()
+            except Exception as e:
+                print(f" [WARN] Couldn't warm a new context ({attempt + 1}/{RECYCLE_ATTEMPTS}): {str(e)[:100]}")
+        self.live -= 1
+        print(f" [WARN] Browser pool shrunk to {self.live} contexts")
+        if not self.live:
+            self.idle.put_nowait(None)
+        return None, None
+
+    def memory_rss(self):
+        if psutil is None:
+            return None
+        total = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                if "chrom" in child.name().lower():
+                    total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    async def close(self):
+        while not self.idle.empty():
+            item = self.idle.get_nowait()
+            if item:
+                await item[0].close()
+        if self.browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
 
-                page.wait_for_timeout(3000)
 
+async def scrape_article(pool, article_id, max_retries=3, budget_ms=ARTICLE_BUDGET_MS, validate_xml=False):
+    folder = article_folder(article_id)
+    context, page = await pool.acquire()
+    clock = ArticleClock(budget_ms)
+    try:
+        for attempt in range(max_retries):
+            print(f" [{article_id}] Attempt {attempt + 1}/{max_retries}")
+            try:
+                print(f" [{article_id}] Loading article...")
+                with clock.phase("load"):
+                    response = await page.goto(
+                        ARTICLE_URL.format(article_id),
+                        wait_until='domcontentloaded',
+                        timeout=min(45000, clock.remaining_ms())
+                    )
+
+                telemetry.inc("http_responses_total", status=str(response.status) if response else "error")
+                if not response or response.status != 200:
+                    raise Exception(f"HTTP {response.status if response else 'No response'}")
 
-                data = extract_metadata(page)
+                with clock.phase("ready"):
+                    if pool.wait_mode == "fixed":
+                        await page.wait_for_timeout(5000)
+                        try:
+                            await page.wait_for_selector('h1, .page_title, title', timeout=10000)
+                        except:
+                            pass
+                        await page.wait_for_timeout(3000)
+                    else:
+                        await wait_for_ready(page, ARTICLE_READY_SELECTOR, clock.remaining_ms())
+
+                with clock.phase("extract"):
+                    data = await extract_metadata(page, article_id)
                 if not data:
                     print("Metadata extraction failed")
                     continue
@@ -101,69 +338,111 @@ def playwright_scrape():
 
 
                 if data["galley_url"]:
-                    pdf_name, pdf_size = download_pdf_playwright(page, data["galley_url"], folder)
-                    data["pdf_name"] = pdf_name
-                    data["pdf_size"] = pdf_size
+                    pdf_name, pdf_size = await download_pdf_playwright(
+                        page, data["galley_url"], folder, article_id, clock, pool.wait_mode
+                    )
                 else:
-                    data["pdf_name"] = ""
-                    data["pdf_size"] = 0
+                    pdf_name, pdf_size = "", 0
+                data["pdf_name"] = pdf_name
+                data["pdf_size"] = pdf_size
 
-                write_xml(data, folder, pdf_name, pdf_size)
-                print(" SUCCESS! Full metadata extracted.")
-                return
+                with clock.phase("xml"):
+                    write_xml(data, folder, pdf_name, pdf_size, validate_xml)
+                telemetry.inc("articles_total", outcome="saved")
+                print(f" [{article_id}] SUCCESS! Full metadata extracted.")
+                print(f" [{article_id}] timing: {clock.summary()}")
+                return True
 
             except Exception as e:
-                print(f" Attempt {attempt+1} failed: {str(e)[:100]}...")
+                telemetry.inc("attempts_failed_total")
+                print(f" [{article_id}] Attempt {attempt+1} failed: {str(e)[:100]}...")
+                print(f" [{article_id}] timing: {clock.summary()}")
                 if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
-
-            finally:
-                browser.close()
-                time.sleep(1)
-
-def extract_metadata(page):
+                    if clock.remaining_ms() <= 2 ** attempt * 1000:
+                        print(f" [{article_id}] Out of the {budget_ms}ms article budget, giving up")
+                        break
+                    await asyncio.sleep(2 ** attempt)
+                    context, page = await pool.recycle(context)
+                    if context is None:
+                        break
+        telemetry.inc("articles_total", outcome="failed")
+        return False
+    finally:
+        if context is not None:
+            pool.release(context, page)
+
+
+async def playwright_scrape(article_ids=ARTICLE_IDS, pool_size=POOL_SIZE, headless=HEADLESS, slow_mo=SLOW_MO,
+                            wait_mode=WAIT_MODE, budget_ms=ARTICLE_BUDGET_MS, challenge_cookie=CHALLENGE_COOKIE,
+                            validate_xml=False, metrics_port=None):
+    article_ids = list(article_ids)
+    os.makedirs(ROOT, exist_ok=True)
+    exporter = metrics.MetricsExporter(telemetry, metrics_port, os.path.join(ROOT, metrics.SNAPSHOT_FILENAME))
+    pool = BrowserPool(min(pool_size, len(article_ids)) or 1, headless, slow_mo, wait_mode, challenge_cookie)
+
+    async with pool:
+        started = time.monotonic()
+        work = asyncio.Queue()
+        for article_id in article_ids:
+            work.put_nowait(article_id)
+        results = []
+
+        async def worker():
+            while not work.empty():
+                article_id = work.get_nowait()
+                try:
+                    results.append(await scrape_article(pool, article_id, budget_ms=budget_ms, validate_xml=validate_xml))
+                except Exception as e:
+                    print(f" [{article_id}] Failed: {e}")
+                    results.append(False)
+
+        await asyncio.gather(*(worker() for _ in range(pool.size)))
+        elapsed = time.monotonic() - started
+        rss = pool.memory_rss()
+
+    done = sum(results)
+    per_minute = done / elapsed * 60 if elapsed else 0.0
+    memory = f"{rss / 1024 ** 2:.0f} MB" if rss is not None else "n/a (install psutil)"
+    print(f"\n Scraped {done}/{len(article_ids)} articles in {elapsed:.1f}s "
+          f"({per_minute:.1f} articles/min, {pool.size} contexts) | browser memory: {memory}")
+    print(" Phase latency:")
+    for line in telemetry.summary():
+        print(f"   {line}")
+    exporter.close()
+    return done
+
+
+async def solve_session(headless=True, challenge_cookie=CHALLENGE_COOKIE):
+    async with BrowserPool(1, headless, 0, WAIT_MODE, challenge_cookie) as pool:
+        context, page = await pool.acquire()
+        cookies = await context.cookies(BASE_URL)
+        user_agent = await page.evaluate("navigator.userAgent")
+        pool.release(context, page)
+    return {"cookies": {cookie["name"]: cookie["value"] for cookie in cookies}, "user_agent": user_agent}
+
+
+def export_session(headless=True, challenge_cookie=CHALLENGE_COOKIE):
+    session = asyncio.run(solve_session(headless, challenge_cookie))
+    print(f" Exported {len(session['cookies'])} cookies from the browser session")
+    return session
+
+
+async def extract_metadata(page, article_id):
     try:
         print("Extracting full metadata...")
+        started = time.monotonic()
+        raw = await page.evaluate(EXTRACT_SCRIPT, EXTRACT_SELECTORS)
+        print(f"    Extracted in one evaluate call: {(time.monotonic() - started) * 1000:.0f}ms")
 
 
-        title_selectors = [
-            'h1.page_title', 'h1.title', '.page_title h1',
-            'h1', '.article-title', '#articleTitle'
-        ]
-        title = ""
-        for sel in title_selectors:
-            try:
-                elem = page.query_selector(sel)
-                if elem:
-                    title = elem.inner_text().strip()
-                    break
-            except:
-                continue
-
+        title = raw["title"]
         if not title:
-            title = page.title().strip()
+            title = raw["document_title"].strip()
 
         print(f"    Title: {title[:80]}{'...' if len(title) > 80 else ''}")
 
 
-        meta = {}
-        meta_selectors = {
-            "DC.Identifier.DOI": 'meta[name="DC.Identifier.DOI"]',
-            "DC.Date": 'meta[name="DC.Date"]',
-            "DC.Date.issued": 'meta[name="DC.Date.issued"]',
-            "DC.Subject": 'meta[name="DC.Subject"]',
-            "DC.Source.Volume": 'meta[name="DC.Source.Volume"]',      
-            "DC.Source.Issue": 'meta[name="DC.Source.Issue"]'
-        }
-
-        for key, selector in meta_selectors.items():
-            try:
-                element = page.query_selector(f'meta[name="{key}"]')
-                if element:
-                    meta[key] = element.get_attribute('content') or ""
-            except:
-                continue
-
+        meta = raw["meta"]
 
         volume = meta.get("DC.Source.Volume") or meta.get("citation_volume", "").strip()
         print(f"Volume: {volume}")
@@ -190,60 +469,15 @@ def extract_metadata(page):
 
 
         keywords = meta.get("DC.Subject", "")
-        if not keywords:
-            selectors = ["div.keyword-item a", ".keywords a", "div.keywords a"]
-            for sel in selectors:
-                elements = page.query_selector_all(sel)
-                if elements:
-                    keywords = "|||||||".join(el.inner_text().strip() for el in elements)
-                    break
+        if not keywords and raw["keywords"]:
+            keywords = "|||||||".join(raw["keywords"])
         keywords = keywords.replace(", ", "|||||||").strip()
 
 
-        authors = []
-        author_selectors = ["div.authors div.author", ".author", "div.author"]
-        auth_divs = []
+        authors = [tuple(author) for author in raw["authors"]]
 
-        for sel in author_selectors:
-            auth_divs = page.query_selector_all(sel)
-            if auth_divs:
-                break
 
-        affil_selectors = ["div.article-author-affilitation", ".affiliation", "div.affiliation"]
-        affils = []
-        for sel in affil_selectors:
-            affils = page.query_selector_all(sel)
-            if affils:
-                break
-
-        for i, div in enumerate(auth_divs[:10]):
-            try:
-                strong = div.query_selector("strong, .name, h4")
-                if not strong:
-                    continue
-                name = strong.inner_text().strip()
-                orcid_tag = div.query_selector('a[href*="orcid.org"]')
-                orcid = orcid_tag.get_attribute('href') if orcid_tag else ""
-                affil = affils[i].inner_text().strip() if i < len(affils) else ""
-                authors.append((name, affil, orcid))
-            except:
-                continue
-
-        
-        galley_selectors = [
-            'a.galley-link.obj_galley_link.pdf',
-            'a[href*=".pdf"]',
-            '.galley-link[href$=".pdf"]',
-            'a.download'
-        ]
-        galley_url = ""
-        for sel in galley_selectors:
-            galley = page.query_selector(sel)
-            if galley:
-                href = galley.get_attribute('href')
-                if href:
-                    galley_url = urljoin(BASE_URL, href)
-                    break
+        galley_url = urljoin(BASE_URL, raw["galley_href"]) if raw["galley_href"] else ""
 
         return {
             "title": title,
@@ -261,36 +495,43 @@ def extract_metadata(page):
         print(f"Metadata error: {e}")
         return None
 
-def download_pdf_playwright(page, galley_url, folder):
+async def download_pdf_playwright(page, galley_url, folder, article_id, clock=None, wait_mode=WAIT_MODE):
+    clock = clock or ArticleClock()
     try:
-        page.goto(galley_url, wait_until='domcontentloaded', timeout=30000)
-        page.wait_for_timeout(3000)
+        with clock.phase("galley"):
+            await page.goto(galley_url, wait_until='domcontentloaded', timeout=min(30000, clock.remaining_ms()))
+            if wait_mode == "fixed":
+                await page.wait_for_timeout(3000)
+            else:
+                await wait_for_ready(page, GALLEY_READY_SELECTOR, clock.remaining_ms())
 
         dl_selectors = ["a.download", 'a[href$=".pdf"]', ".download"]
         dl_link = None
         for sel in dl_selectors:
-            dl_link = page.query_selector(sel)
+            dl_link = await page.query_selector(sel)
             if dl_link:
                 break
 
         if not dl_link:
             return "", 0
 
-        pdf_url = dl_link.get_attribute('href')
+        pdf_url = await dl_link.get_attribute('href')
         if not pdf_url.startswith('http'):
             pdf_url = urljoin(BASE_URL, pdf_url)
 
-        with page.expect_download(timeout=45000) as download_info:
-            dl_link.click(force=True)
-
-        download = download_info.value
+        with clock.phase("download"):
+            async with page.expect_download(timeout=min(45000, clock.remaining_ms())) as download_info:
+                await dl_link.click(force=True)
+            download = await download_info.value
         filename = os.path.basename(urlparse(pdf_url).path) or f"{article_id}.pdf"
         if not filename.endswith('.pdf'):
             filename += '.pdf'
 
         path = os.path.join(folder, filename)
-        download.save_as(path)
+        with clock.phase("download"):
+            await download.save_as(path)
         size = os.path.getsize(path)
+        telemetry.inc("bytes_received_total", size)
         print(f" PDF saved: {filename} ({size:,} bytes)")
         return filename, size
 
@@ -299,62 +540,45 @@ def download_pdf_playwright(page, galley_url, folder):
         return "", 0
 
 
-	
-def escape_(text):
-    return re.sub(r'&(?!#?\w+;)', '&amp;', text)
-
-def write_xml(data, folder, pdf_name="", pdf_size=0):
-    authors_xml = ""
-    for n, a, o in data.get("authors", []):
-        authors_xml += f"""        <Author>
-            <Name>{n}</Name>
-            <Affiliation>{a}</Affiliation>
-            <ORCID>{o}</ORCID>
-        </Author>"""
-
-    xml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<Article>
-    <Title>{data.get('title', '')}</Title>
-    <Authors>
-{authors_xml}
-    </Authors>
-    <Keywords>{data.get('keywords', '')}</Keywords>
-    <PDFName>{pdf_name}</PDFName>
-    <FileSize>{pdf_size}</FileSize>
-    <PublicationYear>{data.get('year', '')}</PublicationYear>
-    <Volume>{data.get('volume', '')}</Volume>
-    <Issue>{data.get('issue', '')}</Issue>
-    <SourceID>{data['job_id']}</SourceID>
-    <ContentProvider>{JOURNAL}</ContentProvider>
-    <DOI>{data.get('doi', '')}</DOI>
-    <PublisherItemType>Journal Article</PublisherItemType>
-    <StartPage/>
-    <EndPage/>
-    <PageRange/>
-</Article>"""
-
+def write_xml(data, folder, pdf_name="", pdf_size=0, validate=False):
     xml_path = os.path.join(folder, "metadata.xml")
     try:
-        xml_content = escape_(xml)
-        with open(xml_path, "w", encoding="utf-8") as f:            
-            f.write(xml_content)       
-
-        try:
-            parser = etree.XMLParser(recover=False)
-            etree.fromstring(xml_content.encode('utf-8'), parser=parser)
-            print(f"Valid XML generated for article {data.get('job_id', 'unknown')}")
-        except etree.XMLSyntaxError as e:
-            print(f"XML validation warning for article {data.get('job_id', 'unknown')}: {e}")
-
-            
+        article_xml.write_article(xml_path, data, pdf_name, pdf_size, JOURNAL)
     except Exception as e:
         print(f"[ERROR] Failed to write XML file: {e}")
-        return False	
-		
-    return xml_path
+        return False
 
+    if validate:
+        error = article_xml.validate_article(xml_path)
+        if error:
+            print(f"XML validation warning for article {data.get('job_id', 'unknown')}: {error}")
+        else:
+            print(f"Valid XML generated for article {data.get('job_id', 'unknown')}")
+    return xml_path
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape OJS articles with a pool of warmed Playwright contexts.")
+    parser.add_argument("--ids", type=int, nargs="+", default=ARTICLE_IDS, help="article IDs to scrape")
+    parser.add_argument("--range", type=int, nargs=2, metavar=("START", "END"), help="scrape START..END inclusive")
+    parser.add_argument("--root", default=ROOT, help="output folder for this run")
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE, help="number of warmed browser contexts/workers")
+    parser.add_argument("--headless", action="store_true", default=HEADLESS)
+    parser.add_argument("--slow-mo", type=int, default=SLOW_MO)
+    parser.add_argument("--wait-mode", choices=["ready", "fixed"], default=WAIT_MODE,
+                        help="wait on DC meta tags/galley links/network idle, or use the old fixed sleeps")
+    parser.add_argument("--budget-ms", type=int, default=ARTICLE_BUDGET_MS, help="time budget per article")
+    parser.add_argument("--challenge-cookie", default=CHALLENGE_COOKIE,
+                        help="cookie name that marks the JS challenge as solved")
+    parser.add_argument("--validate-xml", action="store_true",
+                        help="re-read every metadata.xml and check it against the article schema")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this local port")
+    args = parser.parse_args()
+    ROOT = args.root
+
+    article_ids = range(args.range[0], args.range[1] + 1) if args.range else args.ids
     print("Running...")
-    playwright_scrape()
+    asyncio.run(playwright_scrape(
+        article_ids, args.pool_size, args.headless, args.slow_mo,
+        args.wait_mode, args.budget_ms, args.challenge_cookie, args.validate_xml, args.metrics_port,
+    ))
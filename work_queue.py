@@ -0,0 +1,121 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+
+LEASE_SIZE = 50
+LEASE_TTL = 120.0
+BUSY_TIMEOUT = 30.0
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS leases (
+                lease_id INTEGER PRIMARY KEY,
+                article_ids TEXT NOT NULL,
+                state TEXT NOT NULL,
+                worker TEXT,
+                expires_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                finished_at REAL
+            )
+        """)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS workers (
+                worker TEXT PRIMARY KEY,
+                root TEXT NOT NULL,
+                last_seen REAL NOT NULL,
+                articles INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+    def create(self, article_ids, lease_size=LEASE_SIZE):
+        article_ids = list(article_ids)
+        chunks = [article_ids[i:i + lease_size] for i in range(0, len(article_ids), lease_size)]
+        self.db.execute("BEGIN IMMEDIATE")
+        self.db.executemany("INSERT INTO leases (article_ids, state) VALUES (?, ?)",
+                            [(json.dumps(chunk), PENDING) for chunk in chunks])
+        self.db.execute("COMMIT")
+        return len(chunks)
+
+    def register(self, worker, root):
+        self.db.execute("""
+            INSERT INTO workers (worker, root, last_seen) VALUES (?, ?, ?)
+            ON CONFLICT(worker) DO UPDATE SET root = excluded.root, last_seen = excluded.last_seen
+        """, (worker, os.path.abspath(root), time.time()))
+
+    def claim(self, worker, ttl=LEASE_TTL):
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.db.execute("""
+                SELECT lease_id, article_ids, state FROM leases
+                WHERE state = ? OR (state = ? AND expires_at < ?)
+                ORDER BY lease_id LIMIT 1
+            """, (PENDING, LEASED, now)).fetchone()
+            if row:
+                self.db.execute("""
+                    UPDATE leases SET state = ?, worker = ?, expires_at = ?, attempts = attempts + 1
+                    WHERE lease_id = ?
+                """, (LEASED, worker, now + ttl, row[0]))
+                self.db.execute("UPDATE workers SET last_seen = ? WHERE worker = ?", (now, worker))
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        if not row:
+            return None
+        if row[2] == LEASED:
+            print(f"[WARN] Reclaimed expired lease {row[0]}")
+        return row[0], json.loads(row[1])
+
+    def heartbeat(self, worker, lease_id, ttl=LEASE_TTL):
+        now = time.time()
+        renewed = self.db.execute("UPDATE leases SET expires_at = ? WHERE lease_id = ? AND worker = ? AND state = ?",
+                                  (now + ttl, lease_id, worker, LEASED)).rowcount
+        self.db.execute("UPDATE workers SET last_seen = ? WHERE worker = ?", (now, worker))
+        return bool(renewed)
+
+    def complete(self, worker, lease_id, articles=0):
+        self.db.execute("BEGIN IMMEDIATE")
+        finished = self.db.execute("""
+            UPDATE leases SET state = ?, finished_at = ?, expires_at = NULL
+            WHERE lease_id = ? AND worker = ? AND state = ?
+        """, (DONE, time.time(), lease_id, worker, LEASED)).rowcount
+        self.db.execute("UPDATE workers SET articles = articles + ?, last_seen = ? WHERE worker = ?",
+                        (articles, time.time(), worker))
+        self.db.execute("COMMIT")
+        return bool(finished)
+
+    def release(self, worker, lease_id):
+        self.db.execute("UPDATE leases SET state = ?, worker = NULL, expires_at = NULL "
+                        "WHERE lease_id = ? AND worker = ? AND state = ?", (PENDING, lease_id, worker, LEASED))
+
+    def counts(self):
+        return dict(self.db.execute("SELECT state, COUNT(*) FROM leases GROUP BY state"))
+
+    def unfinished(self):
+        return self.db.execute("SELECT COUNT(*) FROM leases WHERE state != ?", (DONE,)).fetchone()[0]
+
+    def next_expiry(self):
+        return self.db.execute("SELECT MIN(expires_at) FROM leases WHERE state = ?", (LEASED,)).fetchone()[0]
+
+    def workers(self):
+        return self.db.execute("SELECT worker, root, articles, last_seen FROM workers ORDER BY worker").fetchall()
+
+    def close(self):
+        self.db.close()